@@ -0,0 +1,195 @@
+from board import Board
+from tree import Tree
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import itertools
+import os
+import time
+
+
+class BatchSolver:
+    """ Class that solves many boards with many strategies in parallel.
+
+    Each (board, strategy) pair is a task that is solved by a Tree in a
+    process of a process pool. Results are yielded as soon as each task
+    finishes, not in the order of the boards, and only a bounded number of
+    tasks is submitted at a time, so the input can be a long generator.
+
+    A task result is a dict like:
+        {'id': 0, 'length': 3, 'state': 1234, 'strategy': 'BFS',
+         'solution': ['UP', 'LEFT'], 'size': 12, 'time': 0.5,
+         'timed_out': False, 'solvable': True, 'lower_bound': 2,
+         'suboptimality': None, 'stats': {'expansions': 5, ...},
+         'error': None}
+    where id is the board index in the input, solution is None when the
+    board is not solvable, the task was stopped by its timeout or failed,
+    lower_bound is an admissible estimative of the solution length that
+    is known before searching (see estimate), suboptimality is the bound
+    of the anytime strategies and stats is the SearchStats summary. A
+    failed task, like a strategy that does not support the board length,
+    does not stop the other tasks: its result has the exception message
+    in error and None in the fields that were not measured.
+    """
+    # Strategies that can be used, with the Tree method that executes them
+    STRATEGIES = {
+        'BFS': lambda tree: tree.BFS(),
+        'DFS': lambda tree: tree.DFS(),
+        'IDS': lambda tree: tree.IDS(),
+        'A_STAR_A': lambda tree: tree.A_star(tree.heuristic_a),
+        'A_STAR_B': lambda tree: tree.A_star(tree.heuristic_b),
+        'A_STAR_MANHATTAN': lambda tree: tree.A_star(tree.manhattan_distance),
+        'IDA_STAR_MANHATTAN':
+            lambda tree: tree.IDA_star(tree.manhattan_distance),
+        'A_STAR_PDB': lambda tree: tree.A_star(tree.pattern_database),
+        'BIDIRECTIONAL_BFS': lambda tree: tree.bidirectional_BFS(),
+        'BIDIRECTIONAL_A_STAR_MANHATTAN':
+            lambda tree: tree.bidirectional_A_star(tree.manhattan_distance),
+        'SMA_STAR_MANHATTAN':
+            lambda tree: tree.SMA_star(tree.manhattan_distance),
+        'A_STAR_LINEAR_CONFLICT':
+            lambda tree: tree.A_star(tree.linear_conflict),
+        'IDA_STAR_LINEAR_CONFLICT':
+            lambda tree: tree.IDA_star(tree.linear_conflict),
+        'A_STAR_WALKING_DISTANCE':
+            lambda tree: tree.A_star(tree.walking_distance),
+        'IDA_STAR_WALKING_DISTANCE':
+            lambda tree: tree.IDA_star(tree.walking_distance),
+        'ANYTIME_A_STAR_LINEAR_CONFLICT':
+            lambda tree: tree.anytime_A_star(tree.linear_conflict),
+        'EXACT': lambda tree: tree.exact(),
+    }
+    # Number of submitted tasks for each worker process
+    TASKS_PER_WORKER = 4
+
+    def __init__(self, workers=None, timeout=None):
+        """ Build a batch solver.
+
+        Keyword arguments:
+        workers -- number of worker processes, the CPU count by default
+        timeout -- maximum seconds of search for each task, None for no limit
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+
+    def solve(self, boards, strategies):
+        """ Solves each board with each strategy, yielding the results as
+        the tasks finish.
+
+        Keyword arguments:
+        boards -- iterable of Board objects
+        strategies -- list of strategy names, like the STRATEGIES keys
+        """
+        for strategy in strategies:
+            if strategy not in self.STRATEGIES:
+                raise ValueError('Unknown strategy: {}'.format(strategy))
+
+        tasks = (
+            (identifier, board.length, board.to_state(), strategy,
+             self.timeout)
+            for identifier, board in enumerate(boards)
+            for strategy in strategies
+        )
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            # Submit the first tasks, one more task is submitted
+            # for each finished task
+            # Task of each running future
+            running = {
+                executor.submit(BatchSolver.solve_task, task): task
+                for task in itertools.islice(
+                    tasks, self.workers * self.TASKS_PER_WORKER)
+            }
+            while running:
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    task = running.pop(future)
+                    for next_task in itertools.islice(tasks, 1):
+                        running[executor.submit(
+                            BatchSolver.solve_task, next_task)] = next_task
+                    try:
+                        yield future.result()
+                    except Exception as error:
+                        # Failures out of the search, like a worker crash
+                        yield BatchSolver.failed_result(task, error)
+
+    @staticmethod
+    def estimate(board):
+        """ Returns what is known about a board before searching, without
+        dispatching a task, like:
+            {'length': 3, 'state': 1234, 'solvable': True, 'lower_bound': 2}
+        where lower_bound is the lower_bound of the task results.
+
+        Keyword arguments:
+        board -- Board object
+        """
+        decision_tree = Tree(board)
+        return {
+            'length': board.length,
+            'state': board.to_state(),
+            'solvable': decision_tree.solvable,
+            'lower_bound': decision_tree.lower_bound,
+        }
+
+    @staticmethod
+    def solve_task(task, stop=None):
+        """ Solves a single task and returns its result, it runs in the
+        worker processes.
+
+        Keyword arguments:
+        task -- tuple of (id, board length, board state, strategy, timeout)
+        stop -- method that returns True when the search must stop, see
+                Tree.stop
+        """
+        identifier, length, state, strategy, timeout = task
+        try:
+            board = Board(length)
+            board.load_state(state)
+            decision_tree = Tree(board)
+            decision_tree.stop = stop
+
+            start = time.monotonic()
+            if timeout is not None:
+                decision_tree.deadline = start + timeout
+            out = BatchSolver.STRATEGIES[strategy](decision_tree)
+            end = time.monotonic()
+        except Exception as error:
+            return BatchSolver.failed_result(task, error)
+
+        return {
+            'id': identifier,
+            'length': length,
+            'state': state,
+            'strategy': strategy,
+            'solution': None if decision_tree.timed_out else out,
+            'size': decision_tree.size,
+            'time': end - start,
+            'timed_out': decision_tree.timed_out,
+            'solvable': decision_tree.solvable,
+            'lower_bound': decision_tree.lower_bound,
+            'suboptimality': decision_tree.suboptimality,
+            'stats': decision_tree.stats.summary(),
+            'error': None,
+        }
+
+    @staticmethod
+    def failed_result(task, error):
+        """ Returns the result of a task that raised an exception.
+
+        Keyword arguments:
+        task -- tuple of (id, board length, board state, strategy, timeout)
+        error -- exception raised by the task
+        """
+        identifier, length, state, strategy, _ = task
+        return {
+            'id': identifier,
+            'length': length,
+            'state': state,
+            'strategy': strategy,
+            'solution': None,
+            'size': None,
+            'time': None,
+            'timed_out': False,
+            'solvable': None,
+            'lower_bound': None,
+            'suboptimality': None,
+            'stats': None,
+            'error': '{}: {}'.format(type(error).__name__, error),
+        }
@@ -0,0 +1,394 @@
+from board import Board
+from batch import BatchSolver
+from state import StateSpace
+from tree import Tree
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import json
+import multiprocessing
+import platform
+import random
+import statistics
+import sys
+import time
+try:
+    import resource
+except ImportError:
+    # Peak RSS is only reported on Unix systems
+    resource = None
+
+
+class InstanceSet:
+    """ Class that represents a fixed list of initial boards.
+
+    The generated sets are versioned: a set name always generates the same
+    boards, so runs of different versions of the code can be compared. To
+    change a set, a new name (like 3x3-depth-v2) must be added instead of
+    changing an existing one. The depth sets have boards of exact optimal
+    solution lengths, found by a breadth-first search from the goal, and
+    the walk sets have boards made by seeded random movements.
+
+    Sets can also be loaded from files with a board per line, like the Korf
+    100 instances of the 15-puzzle: each line has the instance number and
+    the 16 piece values, with the empty piece as 0, like:
+        1 14 13 15 7 11 12 9 5 6 0 2 1 4 8 10 3
+    """
+    # Generated sets, by name
+    SETS = {
+        '3x3-depth-v1': {
+            'length': 3, 'depths': (8, 12, 16, 20, 24), 'count': 4,
+            'seed': 2017},
+        '3x3-walk-v1': {
+            'length': 3, 'moves': (50, 100), 'count': 5, 'seed': 2017},
+        '4x4-walk-v1': {
+            'length': 4, 'moves': (20, 30, 40), 'count': 4, 'seed': 2017},
+    }
+
+    def __init__(self, name, instances):
+        """ Build an instance set.
+
+        Keyword arguments:
+        name -- set name, reported with the results
+        instances -- list of (instance id, board length, board state)
+        """
+        self.name = name
+        self.instances = instances
+
+    @classmethod
+    def generate(cls, name):
+        """ Returns the generated instance set of a name of SETS.
+
+        Keyword arguments:
+        name -- set name, like: 3x3-depth-v1
+        """
+        if name not in cls.SETS:
+            raise ValueError('Unknown instance set: {}'.format(name))
+        definition = cls.SETS[name]
+        length = definition['length']
+        generator = random.Random(definition['seed'])
+        instances = []
+        if 'depths' in definition:
+            levels = cls.__levels(length, max(definition['depths']))
+            for depth in definition['depths']:
+                states = generator.sample(levels[depth], definition['count'])
+                for index, state in enumerate(states):
+                    instances.append(
+                        ('d{}-{}'.format(depth, index), length, state))
+        else:
+            for moves in definition['moves']:
+                for index in range(definition['count']):
+                    board = Board(length)
+                    board.randomize(moves, generator)
+                    instances.append(
+                        ('m{}-{}'.format(moves, index), length,
+                         board.to_state()))
+        return cls(name, instances)
+
+    @classmethod
+    def load(cls, path):
+        """ Returns the instance set of a file with a board per line, the
+        line can start with the instance id, like the Korf 100 file.
+
+        Keyword arguments:
+        path -- file path, the file name is the set name
+        """
+        instances = []
+        with open(path) as instances_file:
+            for number, line in enumerate(instances_file, 1):
+                values = line.replace(',', ' ').split()
+                if not values or values[0].startswith('#'):
+                    continue
+                # Instance id, if the line has one more value than a board
+                identifier = str(number)
+                length = int(len(values) ** 0.5)
+                if length * length != len(values):
+                    identifier = values.pop(0)
+                    length = int(len(values) ** 0.5)
+                pieces = [int(value) for value in values]
+                if sorted(pieces) != list(range(length * length)):
+                    raise ValueError(
+                        'line {}: invalid board'.format(number))
+                instances.append((
+                    identifier, length,
+                    StateSpace.for_length(length).encode(pieces)))
+        return cls(path, instances)
+
+    def save(self, path):
+        """ Writes the set in a file that can be loaded by load.
+
+        Keyword arguments:
+        path -- file path
+        """
+        with open(path, 'w') as instances_file:
+            for identifier, length, state in self.instances:
+                pieces = StateSpace.for_length(length).decode(state)
+                instances_file.write('{} {}\n'.format(
+                    identifier, ' '.join(str(x) for x in pieces)))
+
+    @staticmethod
+    def __levels(length, max_depth):
+        """ Returns the sorted list of states of each solution length, up to
+        max_depth, by a breadth-first search from the goal.
+
+        Keyword arguments:
+        length -- number of columns and rows of the board
+        max_depth -- maximum solution length
+        """
+        space = StateSpace.for_length(length)
+        visited = {space.goal}
+        levels = [[space.goal]]
+        while len(levels) <= max_depth:
+            level = []
+            for state in levels[-1]:
+                for _, child_state in space.successors(state):
+                    if child_state not in visited:
+                        visited.add(child_state)
+                        level.append(child_state)
+            levels.append(sorted(level))
+        return levels
+
+
+class Benchmark:
+    """ Class that measures the strategies on an instance set.
+
+    Each (instance, strategy) pair is measured in a new process, so the
+    peak RSS (resident memory) of a measurement is not affected by the
+    other ones. The strategy runs warmup times without being measured and
+    then repeat times, and the report has the statistics of the repeated
+    timings, the generated nodes (nodes), the expanded nodes, nodes per
+    second, solution length and if the solution achieves the goal (solved).
+    """
+    # Version of the report format
+    VERSION = 1
+    # Median time growth always tolerated by compare, in seconds, and the
+    # number of standard deviations of the timings tolerated on top of it
+    MIN_TIME_DELTA = 0.002
+    DEVIATIONS = 3
+    # Peak RSS growth always tolerated by compare, in kilobytes
+    MIN_RSS_DELTA = 4096
+
+    def __init__(self, strategies, repeat=5, warmup=1, timeout=None):
+        """ Build a benchmark.
+
+        Keyword arguments:
+        strategies -- list of strategy names, like BatchSolver.STRATEGIES
+        repeat -- number of measured runs of each pair
+        warmup -- number of runs of each pair before the measured ones
+        timeout -- maximum seconds of search for each run, None for no limit
+        """
+        for strategy in strategies:
+            if strategy not in BatchSolver.STRATEGIES:
+                raise ValueError('Unknown strategy: {}'.format(strategy))
+        self.strategies = strategies
+        self.repeat = repeat
+        self.warmup = warmup
+        self.timeout = timeout
+
+    def run(self, instance_set):
+        """ Returns the report of the strategies on an instance set, a
+        dict that can be written as JSON.
+
+        Keyword arguments:
+        instance_set -- InstanceSet to be solved
+        """
+        results = []
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(
+                max_workers=1, mp_context=context,
+                max_tasks_per_child=1) as executor:
+            for identifier, length, state in instance_set.instances:
+                for strategy in self.strategies:
+                    task = (length, state, strategy, self.repeat,
+                            self.warmup, self.timeout)
+                    result = executor.submit(Benchmark.measure, task).result()
+                    result.update(id=identifier, strategy=strategy)
+                    results.append(result)
+        return {
+            'version': self.VERSION,
+            'instance_set': instance_set.name,
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'repeat': self.repeat,
+            'warmup': self.warmup,
+            'timeout': self.timeout,
+            'results': results,
+        }
+
+    @staticmethod
+    def measure(task):
+        """ Measures a strategy on a board and returns its result, it runs
+        in a new process.
+
+        Keyword arguments:
+        task -- tuple of (board length, board state, strategy, repeat,
+                warmup, timeout)
+        """
+        length, state, strategy, repeat, warmup, timeout = task
+        board = Board(length)
+        board.load_state(state)
+        times = []
+        for run in range(warmup + repeat):
+            decision_tree = Tree(board)
+            start = time.perf_counter()
+            if timeout is not None:
+                decision_tree.deadline = time.monotonic() + timeout
+            out = BatchSolver.STRATEGIES[strategy](decision_tree)
+            end = time.perf_counter()
+            if run >= warmup:
+                times.append(end - start)
+
+        # A search that gives up (like at Tree.MAX_SIZE) can return a
+        # movement list that does not achieve the goal
+        space = StateSpace.for_length(length)
+        final_state = state
+        for movement in out or []:
+            final_state = space.move(
+                final_state, StateSpace.DIRECTIONS.index(movement))
+        solved = out is not None and final_state == space.goal
+        median = statistics.median(times)
+        return {
+            'length': length,
+            'state': state,
+            'solved': solved,
+            'solution_length': len(out) if solved else None,
+            'nodes': decision_tree.size,
+            'expansions': decision_tree.stats.expansions,
+            'timed_out': decision_tree.timed_out,
+            'times': times,
+            'median': median,
+            'mean': statistics.mean(times),
+            'stdev': statistics.stdev(times) if len(times) > 1 else 0.0,
+            'nodes_per_second': (
+                decision_tree.size / median if median > 0 else None),
+            # Kilobytes on Linux
+            'peak_rss': (
+                None if resource is None
+                else resource.getrusage(resource.RUSAGE_SELF).ru_maxrss),
+        }
+
+    @staticmethod
+    def compare(baseline, report, threshold=0.1):
+        """ Returns the regressions of a report in relation to a baseline
+        report, as a list of messages.
+
+        A pair regresses when it is not solved or times out, when its
+        solution length changes, when it generates more nodes, or when its
+        median time or peak RSS grows more than its noise. The tolerated
+        median time growth is the largest of threshold and MIN_TIME_DELTA,
+        plus DEVIATIONS times the largest standard deviation of the two
+        runs, so two runs of the same code do not regress; the tolerated
+        peak RSS growth is the largest of threshold and MIN_RSS_DELTA.
+
+        Keyword arguments:
+        baseline -- report of the previous run
+        report -- report of the new run
+        threshold -- relative growth tolerated, like: 0.1 for 10%
+        """
+        previous = {
+            (result['id'], result['strategy']): result
+            for result in baseline['results']
+        }
+        regressions = []
+        for result in report['results']:
+            key = (result['id'], result['strategy'])
+            if key not in previous:
+                continue
+            old = previous[key]
+            name = '{} {}'.format(*key)
+            if result['timed_out'] and not old['timed_out']:
+                regressions.append('{}: timed out'.format(name))
+                continue
+            # Reports of older versions only have solved runs
+            if not result['solved'] and old.get('solved', True):
+                regressions.append('{}: not solved'.format(name))
+                continue
+            if result['solution_length'] != old['solution_length']:
+                regressions.append('{}: solution length {} -> {}'.format(
+                    name, old['solution_length'], result['solution_length']))
+            if result['nodes'] > old['nodes']:
+                regressions.append('{}: nodes {} -> {}'.format(
+                    name, old['nodes'], result['nodes']))
+            tolerance = (
+                max(old['median'] * threshold, Benchmark.MIN_TIME_DELTA)
+                + Benchmark.DEVIATIONS * max(old['stdev'], result['stdev']))
+            if result['median'] > old['median'] + tolerance:
+                regressions.append('{}: median time {:.4f}s -> {:.4f}s'.format(
+                    name, old['median'], result['median']))
+            old_rss, rss = old['peak_rss'], result['peak_rss']
+            if (rss is not None and old_rss is not None
+                    and rss > old_rss + max(old_rss * threshold,
+                                            Benchmark.MIN_RSS_DELTA)):
+                regressions.append('{}: peak RSS {} -> {}'.format(
+                    name, old_rss, rss))
+        return regressions
+
+
+def main(arguments=None):
+    """ Runs a benchmark or compares two benchmark reports.
+
+    Keyword arguments:
+    arguments -- command line arguments, sys.argv by default
+    """
+    parser = argparse.ArgumentParser(description='n-puzzle benchmarks.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help='runs a benchmark')
+    run_parser.add_argument(
+        'instances', help='instance set name ({}) or file with a board per '
+        'line'.format(', '.join(sorted(InstanceSet.SETS))))
+    run_parser.add_argument(
+        '-s', '--strategies', nargs='+', default=['A_STAR_MANHATTAN'],
+        choices=sorted(BatchSolver.STRATEGIES), help='strategies to measure')
+    run_parser.add_argument(
+        '-r', '--repeat', type=int, default=5, help='measured runs')
+    run_parser.add_argument(
+        '-w', '--warmup', type=int, default=1, help='runs before measuring')
+    run_parser.add_argument(
+        '-t', '--timeout', type=float, default=None,
+        help='maximum seconds of search for each run')
+    run_parser.add_argument(
+        '-o', '--output', default='-',
+        help='file where the JSON report is written, stdout by default')
+    save_parser = commands.add_parser(
+        'save', help='writes a generated instance set in a file')
+    save_parser.add_argument('instances', choices=sorted(InstanceSet.SETS))
+    save_parser.add_argument('output', help='instances file')
+    compare_parser = commands.add_parser(
+        'compare', help='flags the regressions between two reports')
+    compare_parser.add_argument('baseline', help='previous report file')
+    compare_parser.add_argument('report', help='new report file')
+    compare_parser.add_argument(
+        '--threshold', type=float, default=0.1,
+        help='relative growth tolerated, like: 0.1 for 10%%')
+    options = parser.parse_args(arguments)
+
+    if options.command == 'save':
+        InstanceSet.generate(options.instances).save(options.output)
+    elif options.command == 'run':
+        if options.instances in InstanceSet.SETS:
+            instance_set = InstanceSet.generate(options.instances)
+        else:
+            instance_set = InstanceSet.load(options.instances)
+        report = Benchmark(
+            options.strategies, options.repeat, options.warmup,
+            options.timeout).run(instance_set)
+        if options.output == '-':
+            json.dump(report, sys.stdout, indent=1)
+            sys.stdout.write('\n')
+        else:
+            with open(options.output, 'w') as report_file:
+                json.dump(report, report_file, indent=1)
+    else:
+        with open(options.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        with open(options.report) as report_file:
+            report = json.load(report_file)
+        regressions = Benchmark.compare(baseline, report, options.threshold)
+        for regression in regressions:
+            print(regression)
+        # The exit status is 1 when there is any regression
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
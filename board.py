@@ -1,3 +1,4 @@
+from state import StateSpace
 import numpy
 import random
 
@@ -25,16 +26,66 @@ class Board:
         self.board = self.__initialize_board(board_length)
         # The board that we would like to achieve
         self.__goal_board = self.__initialize_board(board_length)
+        # The x and y goal positions of each piece value, like:
+        #   goal_x[value], goal_y[value]
+        self.__goal_x, self.__goal_y = self.__goal_positions()
         # Define the x and y for the empty piece
         self.empty_position = {'x': 0, 'y': 0}
 
     def print_board(self):
         print(self.board)
 
-    def available_movements(self):
-        """ List the available movements in the board for empty space. """
+    def copy(self):
+        """ Returns a copy of the board that can be moved independently.
+
+        Only the board array and the empty position are copied, the goal
+        board is shared with the original board because it never changes.
+        """
+        board = Board.__new__(Board)
+        board.length = self.length
+        board.__size = self.__size
+        board.board = self.board.copy()
+        board.__goal_board = self.__goal_board
+        board.__goal_x, board.__goal_y = self.__goal_x, self.__goal_y
+        board.empty_position = dict(self.empty_position)
+        return board
+
+    def to_state(self):
+        """ Returns the compact state of the board.
+
+        The state is an integer that can be used as dict or set key,
+        see StateSpace for its layout.
+        """
+        return StateSpace.for_length(self.length).encode(self.board.ravel())
+
+    def load_state(self, state):
+        """ Replaces the board pieces by the pieces of a compact state.
+
+        Keyword arguments:
+        state -- board state built by to_state or StateSpace
+        """
+        space = StateSpace.for_length(self.length)
+        self.board = numpy.array(space.decode(state), dtype=float).reshape(
+            (self.length, self.length)
+        )
+        x, y = divmod(space.empty(state), self.length)
+        self.empty_position = {'x': x, 'y': y}
+
+    def is_solvable(self):
+        """ Checks if the goal can be achieved from the board.
+
+        See StateSpace.is_solvable for the inversions parity rule.
+        """
+        return StateSpace.for_length(self.length).is_solvable(self.to_state())
+
+    def available_movements(self, generator=random):
+        """ List the available movements in the board for empty space.
+
+        Keyword arguments:
+        generator -- random generator, like: random.Random(seed)
+        """
         move_to = ['UP', 'DOWN', 'RIGHT', 'LEFT']
-        random.shuffle(move_to)  # Sort movements randomly
+        generator.shuffle(move_to)  # Sort movements randomly
         return list(filter(lambda x: self.__valid_movement(x), move_to))
 
     def move(self, command):
@@ -48,43 +99,46 @@ class Board:
             return
         self.__move_empty_position_to(command)
 
-    def randomize(self, moves_count):
+    def randomize(self, moves_count, generator=random):
         """ Makes moves_count movements randomly in the board.
 
+        A movement can undo the last one. To generate many boards, see
+        InstanceGenerator.
+
         Keyword arguments:
         moves_count -- the number of random movements to be done in board
+        generator -- random generator, like: random.Random(seed), in order
+                     to make the same movements again
         """
         for _ in range(moves_count):
-            move_to = random.sample(self.available_movements(), 1)[0]
+            move_to = generator.sample(
+                self.available_movements(generator), 1)[0]
             self.move(move_to)
 
     def is_goal_achieved(self):
         """ Checks if the board is equal to the goal.
 
-        We compare the two-dimensional arrays with the equal operator.
-        It returns a True/False two-dimensional array. After that,
-        we examine if the count of True positions is equal to board size.
+        We compare the two-dimensional arrays position by position and
+        examine if every position is equal.
 
         [0][7][6]    [0][1][2]    [T][F][F]
-        [2][4][3] == [3][4][5] -> [F][T][F] -> 3 != 9 (board size)
+        [2][4][3] == [3][4][5] -> [F][T][F] -> False
         [1][5][8]    [6][7][8]    [F][F][T]
         """
-        compared_board = self.board == self.__goal_board
-        return sum(map(sum, compared_board)) == self.__size
+        return bool(numpy.array_equal(self.board, self.__goal_board))
 
     def difference_to_goal(self):
         """ Returns the number of pieces that are not in the correct position.
 
-        We compare the two-dimensional arrays with the equal operator. 
-        It returns a True/False two-dimensional array. After that, 
-        we subtract the count of True positions of the board size.
-        
-        [0][7][6]    [0][1][2]    [T][F][F]
-        [2][4][3] == [3][4][5] -> [F][T][F] -> 9 - 3 = 6
-        [1][5][8]    [6][7][8]    [F][F][T]
+        We compare the two-dimensional arrays with the not equal operator.
+        It returns a True/False two-dimensional array. After that,
+        we count the True positions.
+
+        [0][7][6]    [0][1][2]    [F][T][T]
+        [2][4][3] != [3][4][5] -> [T][F][T] -> 6
+        [1][5][8]    [6][7][8]    [T][T][F]
         """
-        compared_board = self.board == self.__goal_board
-        return self.__size - sum(map(sum, compared_board))
+        return int(numpy.count_nonzero(self.board != self.__goal_board))
 
     def sum_of_absolute_differences(self):
         """ Returns the absolute sum of differences of each board position
@@ -99,7 +153,7 @@ class Board:
         [1][5][8]    [6][7][8]    [-5][-2][0]
         """
         difference = self.board - self.__goal_board
-        return sum(sum(map(lambda x: abs(x), difference)))
+        return int(numpy.abs(difference).sum())
 
     def manhattan_distance(self):
         """ Returns the sum of manhattan distance of each position with the goal
@@ -111,17 +165,14 @@ class Board:
         [2][4][3]    distance     [3][4][5] -> [3][0][2] -> 13
         [1][5][8]    of goal      [6][7][8]    [2][2][0]
         """
-        total_sum = 0
-        # For each x and y of board, we calculate it manhattan distance
-        #   according to it the goal position
-        for x_1, y_1 in numpy.ndindex(self.board.shape):
-            # Get x and y value in board
-            value = self.board[x_1, y_1]
-            # Get x and y for value in goal board
-            x_2, y_2 = self.board_index(self.__goal_board, value)
-            # Sum to the total, the manhattan distance from position and goal
-            total_sum += abs(x_1 - x_2) + abs(y_1 - y_2)
-        return total_sum
+        # Piece values and x and y of each board position
+        values = self.board.astype(int)
+        x_1, y_1 = numpy.indices(values.shape)
+        # Sum the manhattan distance from each position to its value goal
+        return int(
+            numpy.abs(x_1 - self.__goal_x[values]).sum()
+            + numpy.abs(y_1 - self.__goal_y[values]).sum()
+        )
 
     def board_index(self, board, value):
         """ Returns board index (x, y) for a given value.
@@ -159,6 +210,23 @@ class Board:
                 start_values += 1
         return board
 
+    def __goal_positions(self):
+        """ Returns two arrays with the goal x and y of each piece value.
+
+        For the goal board:
+                        [0][1][2]
+                        [3][4][5]
+                        [6][7][8]
+        returns: x = [0, 0, 0, 1, 1, 1, 2, 2, 2]
+                 y = [0, 1, 2, 0, 1, 2, 0, 1, 2]
+        """
+        goal_x = numpy.zeros(self.__size, dtype=int)
+        goal_y = numpy.zeros(self.__size, dtype=int)
+        x, y = numpy.indices(self.__goal_board.shape)
+        values = self.__goal_board.astype(int)
+        goal_x[values], goal_y[values] = x, y
+        return goal_x, goal_y
+
     def __move_to(self, direction):
         """ Returns an object with x and y direction for the movement.
 
@@ -0,0 +1,187 @@
+from state import StateSpace
+import argparse
+import json
+import os
+import struct
+
+
+class Checkpoint:
+    """ Class that represents a snapshot of a BFS or A* search, that can be
+    saved in a compact binary file and resumed by Tree.resume.
+
+    The snapshot has the search nodes that are still needed (the frontier
+    nodes and their ancestors), the frontier in the order it would be
+    expanded, the closed set (the best known depth of each visited state),
+    the current bound and the counters. The file layout is:
+        header -- HEADER fields
+        nodes -- state, parent node index and direction of each node,
+                 parents first
+        frontier -- node index and heuristic value of each frontier node
+        closed -- state and best known depth of each visited state
+    where a state uses the minimum number of bytes of its board length.
+    """
+    # File signature and layout version
+    MAGIC = b'NPCK'
+    VERSION = 1
+    # Signature, version, board length, strategy, heuristic name, bound,
+    # tree size, expansions, generations, duplicates, heuristic
+    # evaluations, max frontier and the number of nodes, frontier nodes
+    # and closed states
+    HEADER = struct.Struct('<4sHB16s32sd9q')
+    # Parent node index and direction of a node, after its state
+    NODE = struct.Struct('<IB')
+    # Node index and heuristic value of a frontier node
+    FRONTIER = struct.Struct('<Ii')
+    # Best known depth of a closed state, after the state
+    CLOSED = struct.Struct('<I')
+    # Parent index of the head node and direction of the head node
+    NONE = 0xFFFFFFFF
+    NO_DIRECTION = 255
+    # Counters of SearchStats kept in the checkpoint
+    COUNTERS = ('expansions', 'generations', 'duplicates',
+                'heuristic_evaluations', 'max_frontier')
+
+    def __init__(self, length, strategy, heuristic, bound, size, counters,
+                 nodes, frontier, closed):
+        """ Build a checkpoint.
+
+        Keyword arguments:
+        length -- number of columns and rows of the board
+        strategy -- name of the Tree strategy, like: A_star
+        heuristic -- name of the Tree heuristic, empty for BFS
+        bound -- f-bound (or depth) of the current iteration
+        size -- tree size
+        counters -- dict of the SearchStats COUNTERS
+        nodes -- list of (state, parent node index or None, direction)
+        frontier -- list of (node index, heuristic value or None)
+        closed -- list of (state, best known depth)
+        """
+        self.length = length
+        self.strategy = strategy
+        self.heuristic = heuristic
+        self.bound = bound
+        self.size = size
+        self.counters = counters
+        self.nodes = nodes
+        self.frontier = frontier
+        self.closed = closed
+
+    @staticmethod
+    def state_bytes(length):
+        """ Returns the number of bytes of a state of a board length.
+
+        Keyword arguments:
+        length -- number of columns and rows of the board
+        """
+        space = StateSpace.for_length(length)
+        return (space.empty_shift + (space.size - 1).bit_length() + 7) // 8
+
+    def save(self, path):
+        """ Writes the checkpoint in path, through a temporary file in order
+        to never leave an incomplete checkpoint.
+
+        Keyword arguments:
+        path -- file path of the checkpoint
+        """
+        width = self.state_bytes(self.length)
+        parts = [self.HEADER.pack(
+            self.MAGIC, self.VERSION, self.length,
+            self.strategy.encode(), self.heuristic.encode(),
+            float(self.bound), self.size,
+            *[self.counters[name] for name in self.COUNTERS],
+            len(self.nodes), len(self.frontier), len(self.closed))]
+        for state, parent, direction in self.nodes:
+            parts.append(state.to_bytes(width, 'little'))
+            parts.append(self.NODE.pack(
+                self.NONE if parent is None else parent,
+                self.NO_DIRECTION if direction is None else direction))
+        for index, heuristic_value in self.frontier:
+            parts.append(self.FRONTIER.pack(index, heuristic_value or 0))
+        for state, cost in self.closed:
+            parts.append(state.to_bytes(width, 'little'))
+            parts.append(self.CLOSED.pack(cost))
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        temporary_path = '{}.{}.tmp'.format(path, os.getpid())
+        with open(temporary_path, 'wb') as checkpoint_file:
+            checkpoint_file.write(b''.join(parts))
+        os.replace(temporary_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """ Returns the checkpoint saved in path.
+
+        Keyword arguments:
+        path -- file path of the checkpoint
+        """
+        with open(path, 'rb') as checkpoint_file:
+            data = checkpoint_file.read()
+        header = cls.HEADER.unpack_from(data)
+        if header[0] != cls.MAGIC or header[1] != cls.VERSION:
+            raise ValueError('{} is not a search checkpoint'.format(path))
+        length = header[2]
+        strategy = header[3].rstrip(b'\0').decode()
+        heuristic = header[4].rstrip(b'\0').decode()
+        bound, size = header[5], header[6]
+        counters = dict(zip(cls.COUNTERS, header[7:12]))
+        node_count, frontier_count, closed_count = header[12:15]
+
+        width = cls.state_bytes(length)
+        offset = cls.HEADER.size
+        nodes = []
+        for _ in range(node_count):
+            state = int.from_bytes(data[offset:offset + width], 'little')
+            parent, direction = cls.NODE.unpack_from(data, offset + width)
+            offset += width + cls.NODE.size
+            nodes.append((
+                state, None if parent == cls.NONE else parent,
+                None if direction == cls.NO_DIRECTION else direction))
+        frontier = []
+        for _ in range(frontier_count):
+            frontier.append(cls.FRONTIER.unpack_from(data, offset))
+            offset += cls.FRONTIER.size
+        closed = []
+        for _ in range(closed_count):
+            state = int.from_bytes(data[offset:offset + width], 'little')
+            cost, = cls.CLOSED.unpack_from(data, offset + width)
+            offset += width + cls.CLOSED.size
+            closed.append((state, cost))
+        return cls(length, strategy, heuristic, bound, size, counters, nodes,
+                   frontier, closed)
+
+
+def main(arguments=None):
+    """ Resumes the search of a checkpoint and prints its movement list.
+
+    Keyword arguments:
+    arguments -- command line arguments, sys.argv by default
+    """
+    parser = argparse.ArgumentParser(
+        description='Resumes a BFS or A* search from a checkpoint.')
+    parser.add_argument('checkpoint', help='checkpoint file')
+    parser.add_argument(
+        '-m', '--max-size', type=int, default=None,
+        help='maximum tree size of the resumed search')
+    parser.add_argument(
+        '-i', '--interval', type=float, default=60.0,
+        help='seconds between the checkpoints of the resumed search')
+    options = parser.parse_args(arguments)
+    # Imported here because the tree module imports this one
+    from board import Board
+    from tree import Tree
+
+    checkpoint = Checkpoint.load(options.checkpoint)
+    board = Board(checkpoint.length)
+    board.load_state(checkpoint.nodes[0][0])
+    decision_tree = Tree(board)
+    if options.max_size is not None:
+        decision_tree.MAX_SIZE = options.max_size
+    # The resumed search keeps saving checkpoints in the same file
+    decision_tree.checkpoint_path = options.checkpoint
+    decision_tree.checkpoint_interval = options.interval
+    print(json.dumps(decision_tree.resume(checkpoint)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+from state import StateSpace
+from pattern_database import PatternDatabase
+import math
+import mmap
+import os
+import sys
+
+
+class DistanceTable:
+    """ Class that represents the exact solution length of every board of a
+    small board length, like the 181440 solvable boards of the 8-puzzle.
+
+    The table is indexed by the rank of the board permutation in
+    lexicographic order (its Lehmer code), so a 3x3 table has 9! bytes,
+    where the boards that can not be solved keep UNKNOWN. The table is
+    built once by a breadth-first search from the goal board, saved in a
+    directory and then memory-mapped. A board is solved without any search
+    by moving, in each step, to the neighbor board with a lower distance.
+    """
+    # Maximum board length with a table, 4x4 boards have 16! permutations
+    MAX_LENGTH = 3
+    # Default directory of the tables files, shared with the pattern tables
+    DIRECTORY = PatternDatabase.DIRECTORY
+    # Table value of the boards that can not be solved
+    UNKNOWN = 255
+
+    # Distance tables already loaded for each board length
+    __tables = {}
+
+    @classmethod
+    def for_length(cls, length):
+        """ Returns the distance table of a board length, loading it once.
+
+        Keyword arguments:
+        length -- number of columns and rows of the board (ex: 3)
+        """
+        if length not in cls.__tables:
+            cls.__tables[length] = cls(length)
+        return cls.__tables[length]
+
+    def __init__(self, length, directory=None):
+        """ Load the distance table of a board length, building it if its
+        file does not exist.
+
+        Keyword arguments:
+        length -- number of columns and rows of the board (ex: 3)
+        directory -- directory of the table file
+        """
+        if length > self.MAX_LENGTH:
+            raise ValueError(
+                'Distance tables are only built up to {0}x{0} boards'.format(
+                    self.MAX_LENGTH))
+        self.__space = StateSpace.for_length(length)
+        self.directory = directory or self.DIRECTORY
+        # Weight of each position in the rank, like: (size - 1 - i)!
+        size = self.__space.size
+        self.__weights = [math.factorial(size - 1 - i) for i in range(size)]
+        self.__table = self.__load()
+
+    def path(self):
+        """ Returns the file path of the table. """
+        return os.path.join(
+            self.directory, '{}-distances.bin'.format(self.__space.length))
+
+    def rank(self, state):
+        """ Returns the lexicographic rank of the board permutation.
+
+        Keyword arguments:
+        state -- board state
+        """
+        pieces = self.__space.decode(state)
+        rank = 0
+        # Bit mask of the piece values already seen
+        seen = 0
+        for value, weight in zip(pieces, self.__weights):
+            # Number of lower values that were not seen yet
+            lower = value - bin(seen & ((1 << value) - 1)).count('1')
+            rank += lower * weight
+            seen |= 1 << value
+        return rank
+
+    def distance(self, state):
+        """ Returns the solution length of a board, or None if it can not
+        be solved.
+
+        Keyword arguments:
+        state -- board state
+        """
+        distance = self.__table[self.rank(state)]
+        return None if distance == self.UNKNOWN else distance
+
+    def solve(self, state):
+        """ Returns an optimal movement list to solve a board, like:
+        ['UP', 'LEFT'], or None if it can not be solved.
+
+        Keyword arguments:
+        state -- board state
+        """
+        distance = self.distance(state)
+        if distance is None:
+            return None
+        table = self.__table
+        movements = []
+        while distance > 0:
+            # One of the neighbor boards is one movement closer to the goal
+            for direction, child_state in self.__space.successors(state):
+                if table[self.rank(child_state)] == distance - 1:
+                    break
+            movements.append(StateSpace.DIRECTIONS[direction])
+            state = child_state
+            distance -= 1
+        return movements
+
+    def build(self):
+        """ Returns the table as a bytearray, by a breadth-first search from
+        the goal board.
+        """
+        space = self.__space
+        table = bytearray([self.UNKNOWN]) * math.factorial(space.size)
+        table[self.rank(space.goal)] = 0
+        level = [space.goal]
+        distance = 0
+        while level:
+            distance += 1
+            next_level = []
+            for state in level:
+                for _, child_state in space.successors(state):
+                    rank = self.rank(child_state)
+                    if table[rank] == self.UNKNOWN:
+                        table[rank] = distance
+                        next_level.append(child_state)
+            level = next_level
+        return table
+
+    def __load(self):
+        """ Returns the memory-mapped table, it is built and saved first if
+        its file does not exist.
+        """
+        path = self.path()
+        if not os.path.exists(path):
+            os.makedirs(self.directory, exist_ok=True)
+            # Written through a temporary file in order to never leave an
+            # incomplete table
+            temporary_path = '{}.{}.tmp'.format(path, os.getpid())
+            with open(temporary_path, 'wb') as table_file:
+                table_file.write(self.build())
+            os.replace(temporary_path, path)
+        with open(path, 'rb') as table_file:
+            return mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+if __name__ == '__main__':
+    # Builds the tables of the board lengths given as arguments
+    for length in sys.argv[1:]:
+        DistanceTable.for_length(int(length))
@@ -0,0 +1,424 @@
+from state import StateSpace
+
+
+class PieceHeuristic:
+    """ Class that represents a heuristic that is a sum of piece costs.
+
+    The heuristic value of a state is the sum of cost(piece, position) for
+    every piece of the board, so the costs are precomputed in a table for
+    each piece and position. When the empty piece moves, only two pieces
+    change their positions, and the child value is calculated from the
+    parent value in O(1) by update.
+
+    The goal state is the StateSpace goal by default, another state can be
+    used to estimate the distance to it, like the initial state.
+    """
+    # Heuristics towards the goal already built, by class and board length
+    __heuristics = {}
+
+    @classmethod
+    def for_length(cls, length):
+        """ Returns the heuristic of a board length towards the StateSpace
+        goal, building its costs table once.
+
+        Keyword arguments:
+        length -- number of columns and rows of the board (ex: 3)
+        """
+        if (cls, length) not in cls.__heuristics:
+            cls.__heuristics[cls, length] = cls(StateSpace.for_length(length))
+        return cls.__heuristics[cls, length]
+
+    def __init__(self, space, goal=None, empty=True):
+        """ Build the costs table of the heuristic.
+
+        Keyword arguments:
+        space -- StateSpace of the board length
+        goal -- board state to be achieved, the space goal by default
+        empty -- if the cost of the empty piece is counted
+        """
+        self.space = space
+        self.goal = space.goal if goal is None else goal
+        self.empty = empty
+        # Piece value of each position in the goal
+        self.goal_pieces = space.decode(self.goal)
+        # Position of each piece in the goal
+        self.goal_positions = [0] * space.size
+        for position, value in enumerate(self.goal_pieces):
+            self.goal_positions[value] = position
+        # Cost of each piece in each position, like: table[piece][position]
+        self.table = [
+            [self.cost(value, position) for position in range(space.size)]
+            for value in range(space.size)
+        ]
+        if not empty:
+            self.table[0] = [0] * space.size
+
+    def __call__(self, state):
+        """ Returns the heuristic value of the state.
+
+        Keyword arguments:
+        state -- board state
+        """
+        table = self.table
+        return sum(
+            table[value][position]
+            for position, value in enumerate(self.space.decode(state))
+        )
+
+    def towards(self, goal):
+        """ Returns the same heuristic estimating the distance to other goal.
+
+        Keyword arguments:
+        goal -- board state to be achieved
+        """
+        return type(self)(self.space, goal, self.empty)
+
+    def update(self, value, state, child_state):
+        """ Returns the heuristic value of a child state from the value of
+        its parent state.
+
+        Keyword arguments:
+        value -- heuristic value of the parent state
+        state -- parent board state
+        child_state -- board state after a single movement of state
+        """
+        space = self.space
+        empty = space.empty(state)
+        position = space.empty(child_state)
+        # The piece goes from the new empty position to the old one
+        piece = space.piece(state, position)
+        table = self.table
+        return (
+            value
+            + table[piece][empty] - table[piece][position]
+            + table[0][position] - table[0][empty]
+        )
+
+    def cost(self, value, position):
+        """ Returns the cost of a piece value in a position.
+
+        Keyword arguments:
+        value -- piece value
+        position -- board position, like: x * length + y
+        """
+        raise NotImplementedError
+
+
+class MisplacedPieces(PieceHeuristic):
+    """ Heuristic that counts the pieces that are not in the goal position.
+    """
+    def cost(self, value, position):
+        return int(self.goal_pieces[position] != value)
+
+
+class AbsoluteDifferences(PieceHeuristic):
+    """ Heuristic that sums the absolute differences of each position value
+    and the goal position value.
+    """
+    def cost(self, value, position):
+        return abs(value - self.goal_pieces[position])
+
+
+class ManhattanDistance(PieceHeuristic):
+    """ Heuristic that sums the manhattan distance of each piece position
+    and its goal position. Without the empty piece, it is admissible.
+    """
+    def cost(self, value, position):
+        x_1, y_1 = divmod(position, self.space.length)
+        x_2, y_2 = divmod(self.goal_positions[value], self.space.length)
+        return abs(x_1 - x_2) + abs(y_1 - y_2)
+
+
+class LinearConflict:
+    """ Heuristic that adds the linear conflicts to the manhattan distance.
+
+    Two pieces are in linear conflict when they are in their goal row (or
+    column) but in the reverse order, so one of them must leave the line
+    and come back, which costs at least 2 movements more than the
+    manhattan distance. For each line, the number of pieces that must
+    leave it is the number of its goal pieces out of the longest increasing
+    sequence of goal positions. The empty piece is not counted, so the
+    heuristic is admissible.
+
+    A movement only changes the manhattan distance of one piece and the
+    conflicts of the two lines it crosses, so update only recalculates
+    these two lines.
+    """
+    # Heuristics towards the goal already built, by board length
+    __heuristics = {}
+
+    @classmethod
+    def for_length(cls, length):
+        """ Returns the heuristic of a board length towards the StateSpace
+        goal, building it once.
+
+        Keyword arguments:
+        length -- number of columns and rows of the board (ex: 3)
+        """
+        if length not in cls.__heuristics:
+            cls.__heuristics[length] = cls(StateSpace.for_length(length))
+        return cls.__heuristics[length]
+
+    def __init__(self, space, goal=None):
+        """ Build the heuristic.
+
+        Keyword arguments:
+        space -- StateSpace of the board length
+        goal -- board state to be achieved, the space goal by default
+        """
+        self.space = space
+        self.goal = space.goal if goal is None else goal
+        self.manhattan = ManhattanDistance(space, self.goal, empty=False)
+        length = space.length
+        # Goal x and y of each piece value
+        self.goal_x = [x // length for x in self.manhattan.goal_positions]
+        self.goal_y = [x % length for x in self.manhattan.goal_positions]
+        # Board positions of each row and of each column
+        self.rows = [
+            [x * length + y for y in range(length)] for x in range(length)]
+        self.columns = [
+            [x * length + y for x in range(length)] for y in range(length)]
+
+    def __call__(self, state):
+        """ Returns the heuristic value of the state.
+
+        Keyword arguments:
+        state -- board state
+        """
+        conflicts = 0
+        for line in range(self.space.length):
+            conflicts += self.__row_conflicts(state, line)
+            conflicts += self.__column_conflicts(state, line)
+        return self.manhattan(state) + 2 * conflicts
+
+    def update(self, value, state, child_state):
+        """ Returns the heuristic value of a child state from the value of
+        its parent state.
+
+        Keyword arguments:
+        value -- heuristic value of the parent state
+        state -- parent board state
+        child_state -- board state after a single movement of state
+        """
+        length = self.space.length
+        empty = self.space.empty(state)
+        position = self.space.empty(child_state)
+        value = self.manhattan.update(value, state, child_state)
+        # A horizontal movement changes the pieces of two columns and a
+        # vertical movement changes the pieces of two rows
+        if empty // length == position // length:
+            conflicts = self.__column_conflicts
+            lines = (empty % length, position % length)
+        else:
+            conflicts = self.__row_conflicts
+            lines = (empty // length, position // length)
+        for line in lines:
+            value += 2 * (conflicts(child_state, line)
+                          - conflicts(state, line))
+        return value
+
+    def towards(self, goal):
+        """ Returns the same heuristic estimating the distance to other goal.
+
+        Keyword arguments:
+        goal -- board state to be achieved
+        """
+        return type(self)(self.space, goal)
+
+    def __row_conflicts(self, state, row):
+        """ Returns the number of pieces that must leave a row. """
+        goal_x, goal_y = self.goal_x, self.goal_y
+        pieces = [
+            self.space.piece(state, position) for position in self.rows[row]]
+        return self.__line_conflicts([
+            goal_y[value] for value in pieces
+            if value != 0 and goal_x[value] == row])
+
+    def __column_conflicts(self, state, column):
+        """ Returns the number of pieces that must leave a column. """
+        goal_x, goal_y = self.goal_x, self.goal_y
+        pieces = [
+            self.space.piece(state, position)
+            for position in self.columns[column]]
+        return self.__line_conflicts([
+            goal_x[value] for value in pieces
+            if value != 0 and goal_y[value] == column])
+
+    def __line_conflicts(self, goals):
+        """ Returns how many goal positions are out of the longest
+        increasing sequence.
+
+        Keyword arguments:
+        goals -- goal positions in the line of its pieces, in board order
+        """
+        if len(goals) < 2:
+            return 0
+        longest = [1] * len(goals)
+        for i in range(1, len(goals)):
+            for j in range(i):
+                if goals[j] < goals[i] and longest[j] + 1 > longest[i]:
+                    longest[i] = longest[j] + 1
+        return len(goals) - max(longest)
+
+
+class WalkingDistance:
+    """ Heuristic that sums the vertical and horizontal walking distances.
+
+    The vertical walking distance only considers, for each row, how many
+    pieces of each goal row it has, like:
+        row 0: [2, 1, 0]  -> 2 pieces of row 0, 1 piece of row 1
+    A vertical movement moves one piece to the row of the empty piece, and
+    the minimum number of vertical movements from each of these tables to
+    the goal table is precomputed once by a breadth-first search. The
+    horizontal walking distance is the same for the columns. Each movement
+    is vertical or horizontal, so the sum is admissible.
+
+    A horizontal movement does not change the rows table and a vertical
+    movement does not change the columns table, so update only looks up
+    the table that changed.
+
+    The goal table only depends on the goal empty piece line, so there are
+    at most length tables of each board length, whatever the goal. 5x5
+    boards have too many tables to be built, up to MAX_LENGTH is allowed.
+    """
+    # Maximum board length, the 5x5 tables do not fit in memory
+    MAX_LENGTH = 4
+    # Distance tables already built, by board length and goal empty line
+    __tables = {}
+    # Heuristics towards the goal already built, by board length
+    __heuristics = {}
+
+    @classmethod
+    def for_length(cls, length):
+        """ Returns the heuristic of a board length towards the StateSpace
+        goal, building it once.
+
+        Keyword arguments:
+        length -- number of columns and rows of the board (ex: 3)
+        """
+        if length not in cls.__heuristics:
+            cls.__heuristics[length] = cls(StateSpace.for_length(length))
+        return cls.__heuristics[length]
+
+    def __init__(self, space, goal=None):
+        """ Build the heuristic and its distance tables.
+
+        Keyword arguments:
+        space -- StateSpace of the board length
+        goal -- board state to be achieved, the space goal by default
+        """
+        if space.length > self.MAX_LENGTH:
+            raise ValueError(
+                'Walking distance is only built up to {0}x{0} boards'.format(
+                    self.MAX_LENGTH))
+        self.space = space
+        self.goal = space.goal if goal is None else goal
+        length = space.length
+        goal_pieces = space.decode(self.goal)
+        # Goal x and y of each piece value
+        self.goal_x = [0] * space.size
+        self.goal_y = [0] * space.size
+        for position, value in enumerate(goal_pieces):
+            self.goal_x[value], self.goal_y[value] = divmod(position, length)
+        # Distance tables of the rows and of the columns
+        self.row_distances = self.__table(self.__rows_key(self.goal))
+        self.column_distances = self.__table(self.__columns_key(self.goal))
+
+    def __call__(self, state):
+        """ Returns the heuristic value of the state.
+
+        Keyword arguments:
+        state -- board state
+        """
+        return (self.row_distances[self.__rows_key(state)]
+                + self.column_distances[self.__columns_key(state)])
+
+    def update(self, value, state, child_state):
+        """ Returns the heuristic value of a child state from the value of
+        its parent state.
+
+        Keyword arguments:
+        value -- heuristic value of the parent state
+        state -- parent board state
+        child_state -- board state after a single movement of state
+        """
+        length = self.space.length
+        if self.space.empty(state) // length == (
+                self.space.empty(child_state) // length):
+            distances, key = self.column_distances, self.__columns_key
+        else:
+            distances, key = self.row_distances, self.__rows_key
+        return value + distances[key(child_state)] - distances[key(state)]
+
+    def towards(self, goal):
+        """ Returns the same heuristic estimating the distance to other goal.
+
+        Keyword arguments:
+        goal -- board state to be achieved
+        """
+        return type(self)(self.space, goal)
+
+    def __rows_key(self, state):
+        """ Returns the rows table of a state and its empty piece row, as a
+        tuple like: (2, 1, 0, 1, 2, 0, 0, 0, 3, 0)
+        """
+        length = self.space.length
+        table = [0] * (length * length)
+        for position, value in enumerate(self.space.decode(state)):
+            if value != 0:
+                table[position // length * length + self.goal_x[value]] += 1
+        table.append(self.space.empty(state) // length)
+        return tuple(table)
+
+    def __columns_key(self, state):
+        """ Returns the columns table of a state and its empty piece column,
+        as a tuple like the rows table.
+        """
+        length = self.space.length
+        table = [0] * (length * length)
+        for position, value in enumerate(self.space.decode(state)):
+            if value != 0:
+                table[position % length * length + self.goal_y[value]] += 1
+        table.append(self.space.empty(state) % length)
+        return tuple(table)
+
+    def __table(self, goal_key):
+        """ Returns the distance of every table to the goal table, built by
+        a breadth-first search from the goal table.
+
+        Keyword arguments:
+        goal_key -- goal table and empty piece line
+        """
+        length = self.space.length
+        # The goal table is the same for every goal with the same empty
+        # line, as each line has the pieces of the same goal line
+        cache_key = (length, goal_key[-1])
+        if cache_key in self.__tables:
+            return self.__tables[cache_key]
+
+        distances = {goal_key: 0}
+        to_visit = [goal_key]
+        while to_visit:
+            next_level = []
+            for key in to_visit:
+                distance = distances[key]
+                empty = key[-1]
+                for line in (empty - 1, empty + 1):
+                    if not 0 <= line < length:
+                        continue
+                    # Moves a piece of each goal line to the empty line
+                    for goal_line in range(length):
+                        if key[line * length + goal_line] == 0:
+                            continue
+                        table = list(key)
+                        table[line * length + goal_line] -= 1
+                        table[empty * length + goal_line] += 1
+                        table[-1] = line
+                        new_key = tuple(table)
+                        if new_key not in distances:
+                            distances[new_key] = distance + 1
+                            next_level.append(new_key)
+            to_visit = next_level
+
+        self.__tables[cache_key] = distances
+        return distances
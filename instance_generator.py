@@ -0,0 +1,192 @@
+from state import StateSpace
+import argparse
+import numpy
+
+
+def movement_targets(space):
+    """ Returns an array with the position reached by the empty piece from
+    each position with each direction index, like: targets[position,
+    direction], or -1 when the movement is not valid.
+
+    Keyword arguments:
+    space -- StateSpace of the board length
+    """
+    targets = numpy.full((space.size, 4), -1, dtype=numpy.int64)
+    for position, neighbors in enumerate(space.neighbors):
+        for direction, target in neighbors:
+            targets[position, direction] = target
+    return targets
+
+
+class InstanceGenerator:
+    """ Class that generates many initial boards at once with NumPy.
+
+    Boards are generated as a two-dimensional array with a row of piece
+    values for each board, ordered by board position like StateSpace, and
+    every operation is done on all the rows at once. There are two kinds
+    of boards:
+        random_walks -- boards made by random movements of the empty piece
+                        from the goal, without undoing the last movement
+        random_permutations -- uniformly random solvable boards: random
+                               permutations whose unsolvable ones have two
+                               pieces swapped, which fixes their parity
+    The same seed generates the same boards.
+    """
+    # Number of boards whose inversions are counted at once
+    CHUNK_SIZE = 65536
+
+    def __init__(self, length, seed=None):
+        """ Build a generator of boards of a length.
+
+        Keyword arguments:
+        length -- number of columns and rows of the board (ex: 3)
+        seed -- seed of the random generator, None for a random seed
+        """
+        self.space = StateSpace.for_length(length)
+        self.random = numpy.random.default_rng(seed)
+        self.targets = movement_targets(self.space)
+
+    def random_walks(self, count, moves):
+        """ Returns an array of count boards made by moves random movements
+        from the goal, never undoing the last movement.
+
+        Keyword arguments:
+        count -- number of boards
+        moves -- number of movements of each board
+        """
+        size = self.space.size
+        boards = numpy.tile(numpy.arange(size, dtype=numpy.uint8), (count, 1))
+        rows = numpy.arange(count)
+        empty = numpy.zeros(count, dtype=numpy.int64)
+        # Direction index of the inverse of the last movement, -1 for none
+        inverse = numpy.full(count, -1, dtype=numpy.int64)
+        inverses = numpy.array(StateSpace.INVERSE, dtype=numpy.int64)
+        for _ in range(moves):
+            targets = self.targets[empty]
+            valid = targets >= 0
+            valid[rows, inverse] &= inverse < 0
+            # The valid direction with the highest random number is chosen,
+            # which chooses uniformly between the valid directions
+            scores = self.random.random((count, 4))
+            scores[~valid] = -1
+            directions = scores.argmax(axis=1)
+            positions = targets[rows, directions]
+            boards[rows, empty] = boards[rows, positions]
+            boards[rows, positions] = 0
+            empty = positions
+            inverse = inverses[directions]
+        return boards
+
+    def random_permutations(self, count):
+        """ Returns an array of count uniformly random solvable boards.
+
+        Keyword arguments:
+        count -- number of boards
+        """
+        size = self.space.size
+        boards = self.random.permuted(
+            numpy.tile(numpy.arange(size, dtype=numpy.uint8), (count, 1)),
+            axis=1)
+        unsolvable = ~self.is_solvable(boards)
+        # Swaps the first two pieces that are not the empty piece, that
+        # changes the inversions parity and keeps the empty position
+        rows = numpy.flatnonzero(unsolvable)
+        empty = boards[rows].argmin(axis=1)
+        first = numpy.where(empty == 0, 1, 0)
+        second = numpy.where(empty <= 1, 2, 1)
+        values = boards[rows, first]
+        boards[rows, first] = boards[rows, second]
+        boards[rows, second] = values
+        return boards
+
+    def is_solvable(self, boards):
+        """ Returns a boolean array that checks if each board can be solved,
+        with the rule of StateSpace.is_solvable.
+
+        Keyword arguments:
+        boards -- array with the pieces of a board in each row
+        """
+        length = self.space.length
+        size = self.space.size
+        # Pairs of positions (i, j) with i < j
+        upper = numpy.triu(numpy.ones((size, size), dtype=bool), 1)
+        parity = numpy.empty(len(boards), dtype=bool)
+        for start in range(0, len(boards), self.CHUNK_SIZE):
+            chunk = boards[start:start + self.CHUNK_SIZE]
+            # Pairs of pieces in reverse order, without the empty piece
+            inversions = (
+                (chunk[:, :, None] > chunk[:, None, :])
+                & (chunk[:, None, :] != 0) & upper
+            ).sum(axis=(1, 2))
+            if length % 2 == 0:
+                inversions += chunk.argmin(axis=1) // length
+            parity[start:start + self.CHUNK_SIZE] = inversions % 2 == 0
+        return parity
+
+    def pack(self, boards):
+        """ Returns an array with a 64 bits integer for each board, with
+        the piece bits of its StateSpace state.
+
+        Keyword arguments:
+        boards -- array with the pieces of a board in each row
+        """
+        space = self.space
+        if space.empty_shift > 64:
+            raise ValueError(
+                'Boards of length {} do not fit in 64 bits'.format(
+                    space.length))
+        packed = numpy.zeros(len(boards), dtype=numpy.uint64)
+        for position in range(space.size):
+            packed |= boards[:, position].astype(numpy.uint64) << numpy.uint64(
+                position * space.bits)
+        return packed
+
+    def states(self, boards):
+        """ Yields the StateSpace state of each board, that can be loaded by
+        Board.load_state or solved by BatchSolver.
+
+        Keyword arguments:
+        boards -- array with the pieces of a board in each row
+        """
+        space = self.space
+        if space.empty_shift > 64:
+            for pieces in boards:
+                yield space.encode(pieces)
+            return
+        packed = self.pack(boards).tolist()
+        empty = boards.argmin(axis=1).tolist()
+        for pieces, position in zip(packed, empty):
+            yield pieces | (position << space.empty_shift)
+
+
+def main(arguments=None):
+    """ Generates boards and saves them in a NumPy file.
+
+    Keyword arguments:
+    arguments -- command line arguments, sys.argv by default
+    """
+    parser = argparse.ArgumentParser(
+        description='Generates many n-puzzle boards.')
+    parser.add_argument('length', type=int, help='board length, like: 3')
+    parser.add_argument('count', type=int, help='number of boards')
+    parser.add_argument('output', help='NumPy (.npy) file')
+    parser.add_argument(
+        '-m', '--moves', type=int, default=None,
+        help='random walk movements, uniformly random boards by default')
+    parser.add_argument('-s', '--seed', type=int, default=None, help='seed')
+    parser.add_argument(
+        '-p', '--packed', action='store_true',
+        help='saves a 64 bits integer per board instead of its pieces')
+    options = parser.parse_args(arguments)
+
+    generator = InstanceGenerator(options.length, options.seed)
+    if options.moves is None:
+        boards = generator.random_permutations(options.count)
+    else:
+        boards = generator.random_walks(options.count, options.moves)
+    numpy.save(
+        options.output, generator.pack(boards) if options.packed else boards)
+
+
+if __name__ == '__main__':
+    main()
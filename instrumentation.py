@@ -0,0 +1,212 @@
+import cProfile
+import functools
+import pstats
+import time
+import tracemalloc
+
+
+def instrumented(strategy):
+    """ Decorator of the Tree strategies that starts the tree stats before
+    the search and stops them after it.
+
+    Keyword arguments:
+    strategy -- Tree search method
+    """
+    @functools.wraps(strategy)
+    def search(tree, *args, **kwargs):
+        tree.stats.start(strategy.__name__)
+        try:
+            return strategy(tree, *args, **kwargs)
+        finally:
+            tree.stats.stop()
+    return search
+
+
+class SearchStats:
+    """ Class that collects what a search strategy does.
+
+    The counters are always collected, as they only cost an increment:
+    expanded nodes, generated nodes, duplicated nodes that were pruned,
+    heuristic evaluations, the maximum frontier size and the f-bound of
+    each iteration (the depth for BFS and IDS, the weight for the A*
+    strategies). The other measures are opt-in because they slow the
+    search down:
+        timing -- time spent in heuristic and queue operations, the rest
+                  of the search time is the expansion time
+        profile -- cProfile stats of the search, in profile_stats
+        trace_memory -- peak bytes allocated during the search, measured
+                        by tracemalloc, in memory_peak
+    The progress callback is called with the stats every progress_interval
+    expansions, like:
+        tree.stats.progress = lambda stats: print(stats.summary())
+    """
+    def __init__(self, timing=False, profile=False, trace_memory=False,
+                 progress=None, progress_interval=10000):
+        """ Build the search stats.
+
+        Keyword arguments:
+        timing -- if heuristic and queue operations are timed
+        profile -- if the search is profiled by cProfile
+        trace_memory -- if the search memory is traced by tracemalloc
+        progress -- method called with the stats during the search, or None
+        progress_interval -- number of expansions between progress calls
+        """
+        self.timing = timing
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.progress = progress
+        self.progress_interval = progress_interval
+        self.reset()
+
+    def reset(self, strategy=None):
+        """ Clears the measures of the last search.
+
+        Keyword arguments:
+        strategy -- name of the next search strategy
+        """
+        self.strategy = strategy
+        self.expansions = 0
+        self.generations = 0
+        self.duplicates = 0
+        self.heuristic_evaluations = 0
+        self.max_frontier = 0
+        # F-bound of each iteration, in order
+        self.bounds = []
+        # Seconds spent in the whole search and in each kind of operation
+        self.search_time = 0.0
+        self.heuristic_time = 0.0
+        self.queue_time = 0.0
+        self.profile_stats = None
+        self.memory_peak = None
+        self.__start_time = None
+        self.__profiler = None
+        self.__tracing = False
+
+    @property
+    def expansion_time(self):
+        """ Returns the seconds of the search out of heuristic and queue
+        operations, it only makes sense with timing.
+        """
+        return self.search_time - self.heuristic_time - self.queue_time
+
+    def start(self, strategy):
+        """ Clears the measures and starts the opt-in captures of a search.
+
+        Keyword arguments:
+        strategy -- name of the search strategy
+        """
+        self.reset(strategy)
+        if self.trace_memory:
+            # Memory is only traced if nobody else is tracing it
+            self.__tracing = not tracemalloc.is_tracing()
+            if self.__tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        if self.profile:
+            self.__profiler = cProfile.Profile()
+            self.__profiler.enable()
+        self.__start_time = time.perf_counter()
+
+    def stop(self):
+        """ Stops the opt-in captures of a search. """
+        self.search_time = time.perf_counter() - self.__start_time
+        if self.__profiler is not None:
+            self.__profiler.disable()
+            self.profile_stats = pstats.Stats(self.__profiler)
+            self.__profiler = None
+        if self.trace_memory:
+            self.memory_peak = tracemalloc.get_traced_memory()[1]
+            if self.__tracing:
+                tracemalloc.stop()
+                self.__tracing = False
+
+    def expand(self, frontier):
+        """ Counts an expanded node.
+
+        Keyword arguments:
+        frontier -- number of nodes waiting to be expanded
+        """
+        self.expansions += 1
+        if frontier > self.max_frontier:
+            self.max_frontier = frontier
+        if (self.progress is not None
+                and self.expansions % self.progress_interval == 0):
+            self.progress(self)
+
+    def bound(self, value):
+        """ Keeps the f-bound of a new iteration, if it is greater than the
+        last one.
+
+        Keyword arguments:
+        value -- f-bound of the current iteration
+        """
+        if not self.bounds or value > self.bounds[-1]:
+            self.bounds.append(value)
+
+    def evaluate(self, heuristic, state):
+        """ Returns the heuristic value of a state, counting the evaluation.
+
+        Keyword arguments:
+        heuristic -- heuristic method
+        state -- board state
+        """
+        return self.update(heuristic)(state)
+
+    def update(self, method):
+        """ Returns a method that calls a heuristic method, counting (and
+        timing, with timing) each evaluation.
+
+        Keyword arguments:
+        method -- heuristic method or heuristic update method
+        """
+        if not self.timing:
+            def counted(*args):
+                self.heuristic_evaluations += 1
+                return method(*args)
+            return counted
+
+        def timed(*args):
+            self.heuristic_evaluations += 1
+            start = time.perf_counter()
+            value = method(*args)
+            self.heuristic_time += time.perf_counter() - start
+            return value
+        return timed
+
+    def queue(self, method):
+        """ Returns a method that calls a frontier method, like push or pop,
+        timing it with timing. Without timing the method is returned.
+
+        Keyword arguments:
+        method -- method of the frontier
+        """
+        if not self.timing:
+            return method
+
+        def timed(*args):
+            start = time.perf_counter()
+            value = method(*args)
+            self.queue_time += time.perf_counter() - start
+            return value
+        return timed
+
+    def summary(self):
+        """ Returns the measures of the last search as a dict. """
+        summary = {
+            'strategy': self.strategy,
+            'expansions': self.expansions,
+            'generations': self.generations,
+            'duplicates': self.duplicates,
+            'heuristic_evaluations': self.heuristic_evaluations,
+            'max_frontier': self.max_frontier,
+            'bounds': list(self.bounds),
+            'search_time': self.search_time,
+        }
+        if self.timing:
+            summary.update(
+                heuristic_time=self.heuristic_time,
+                queue_time=self.queue_time,
+                expansion_time=self.expansion_time)
+        if self.memory_peak is not None:
+            summary['memory_peak'] = self.memory_peak
+        return summary
@@ -1,61 +1,112 @@
 from board import Board
 from tree import Tree
+from distance_table import DistanceTable
+import csv
+import random
 import time
 import numpy
 
 
-# Open results.txt file to write the results
-result_file = open("results.txt", "w")
-# Define the header of csv file
-result_file.write('size,movements,strategy,time,memory,in_board,out\n')
-
 # Define the board length
 N = [3, 4]
 # Define how many movements will be done randonly until to be the initial board state
 MOVES_TO_RANDOMIZE = [50, 100]
+# Define the seed of the random boards, the same seed makes the same boards
+SEED = 2017
 # Define the tree search algorithms
-STRATEGIES = ['DSF', 'BSF', 'IDS', 'A_STAR_A', 'A_STAR_B', 'A_STAR_MANHATTAN']
+STRATEGIES = ['BFS', 'DFS', 'IDS', 'A_STAR_A', 'A_STAR_B', 'A_STAR_MANHATTAN',
+              'IDA_STAR_MANHATTAN', 'A_STAR_PDB', 'BIDIRECTIONAL_BFS',
+              'BIDIRECTIONAL_A_STAR_MANHATTAN', 'SMA_STAR_MANHATTAN',
+              'A_STAR_LINEAR_CONFLICT', 'IDA_STAR_LINEAR_CONFLICT',
+              'A_STAR_WALKING_DISTANCE', 'IDA_STAR_WALKING_DISTANCE', 'EXACT',
+              'ANYTIME_A_STAR_LINEAR_CONFLICT']
+
+# Open results.txt file to write the results, it is closed at the end
+with open("results.txt", "w") as result_file:
+    result_writer = csv.writer(result_file, lineterminator='\n')
+    # Define the header of csv file
+    result_writer.writerow(
+        ['size', 'movements', 'strategy', 'time', 'nodes', 'expansions',
+         'in_board', 'out'])
+    # Random generator of the boards
+    generator = random.Random(SEED)
 
-# Define how many times will execute each configuration
-for _ in range(5):
-    for size in N:
-        for randomize_moves in MOVES_TO_RANDOMIZE:
-            # Create board according to size
-            board = Board(size)
-            # Randomize the board according move counts
-            board.randomize(randomize_moves)
+    # Define how many times will execute each configuration
+    for _ in range(5):
+        for size in N:
+            for randomize_moves in MOVES_TO_RANDOMIZE:
+                # Create board according to size
+                board = Board(size)
+                # Randomize the board according move counts
+                board.randomize(randomize_moves, generator)
 
-            for strategy in STRATEGIES:
-                decision_tree = Tree(board)
-                # Start count time for solving the problem
-                start = time.time()
-                # Choose the strategy solution
-                if strategy == 'DSF':
-                    out = decision_tree.BFS()
-                elif strategy == 'BSF':
-                    out = decision_tree.DFS()
-                elif strategy == 'IDS':
-                    out = decision_tree.IDS()
-                elif strategy == 'A_STA_A':
-                    out = decision_tree.A_star(
-                            lambda x: decision_tree.heuristic_a(x))
-                elif strategy == 'A_STAR_B':
-                    out = decision_tree.A_star(
-                            lambda x: decision_tree.heuristic_b(x))
-                elif strategy == 'A_STAR_MANHATTAN':
-                    out = decision_tree.A_star(
-                            lambda x: decision_tree.manhattan_distance(x))
-                else:
-                    pass
-                # Ends the execution time
-                end = time.time()
+                for strategy in STRATEGIES:
+                    # Exact solutions are only known for small boards
+                    if (strategy == 'EXACT'
+                            and size > DistanceTable.MAX_LENGTH):
+                        continue
+                    decision_tree = Tree(board)
+                    # Start count time for solving the problem
+                    start = time.time()
+                    # Choose the strategy solution
+                    if strategy == 'BFS':
+                        out = decision_tree.BFS()
+                    elif strategy == 'DFS':
+                        out = decision_tree.DFS()
+                    elif strategy == 'IDS':
+                        out = decision_tree.IDS()
+                    elif strategy == 'A_STAR_A':
+                        out = decision_tree.A_star(decision_tree.heuristic_a)
+                    elif strategy == 'A_STAR_B':
+                        out = decision_tree.A_star(decision_tree.heuristic_b)
+                    elif strategy == 'A_STAR_MANHATTAN':
+                        out = decision_tree.A_star(
+                                decision_tree.manhattan_distance)
+                    elif strategy == 'IDA_STAR_MANHATTAN':
+                        out = decision_tree.IDA_star(
+                                decision_tree.manhattan_distance)
+                    elif strategy == 'A_STAR_PDB':
+                        out = decision_tree.A_star(
+                                decision_tree.pattern_database)
+                    elif strategy == 'BIDIRECTIONAL_BFS':
+                        out = decision_tree.bidirectional_BFS()
+                    elif strategy == 'BIDIRECTIONAL_A_STAR_MANHATTAN':
+                        out = decision_tree.bidirectional_A_star(
+                                decision_tree.manhattan_distance)
+                    elif strategy == 'SMA_STAR_MANHATTAN':
+                        out = decision_tree.SMA_star(
+                                decision_tree.manhattan_distance)
+                    elif strategy == 'A_STAR_LINEAR_CONFLICT':
+                        out = decision_tree.A_star(
+                                decision_tree.linear_conflict)
+                    elif strategy == 'IDA_STAR_LINEAR_CONFLICT':
+                        out = decision_tree.IDA_star(
+                                decision_tree.linear_conflict)
+                    elif strategy == 'A_STAR_WALKING_DISTANCE':
+                        out = decision_tree.A_star(
+                                decision_tree.walking_distance)
+                    elif strategy == 'IDA_STAR_WALKING_DISTANCE':
+                        out = decision_tree.IDA_star(
+                                decision_tree.walking_distance)
+                    elif strategy == 'EXACT':
+                        out = decision_tree.exact()
+                    elif strategy == 'ANYTIME_A_STAR_LINEAR_CONFLICT':
+                        out = decision_tree.anytime_A_star(
+                                decision_tree.linear_conflict)
+                    else:
+                        pass
+                    # Ends the execution time
+                    end = time.time()
 
-                # Add result as row in results file
-                result_file.write('{}-{}-{}-{}-{}-{}-{}\n'.format(
-                    size,
-                    randomize_moves,
-                    strategy,
-                    '{0:.2f}'.format(float(end - start) * 1000),
-                    decision_tree.size,
-                    numpy.asarray(board.board).ravel(),
-                    out))
+                    # Add result as row in results file
+                    result_writer.writerow([
+                        size,
+                        randomize_moves,
+                        strategy,
+                        '{0:.2f}'.format(float(end - start) * 1000),
+                        decision_tree.size,
+                        decision_tree.stats.expansions,
+                        ' '.join(
+                            str(int(x))
+                            for x in numpy.asarray(board.board).ravel()),
+                        out if out is None else ' '.join(out)])
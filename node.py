@@ -1,35 +1,40 @@
-class Node:
-    def __init__(self, value=list(), parent_depth=-1):
-        self.value = value
-        self.depth = parent_depth + 1
-        self.__childs = []
+from state import StateSpace
 
-    def add_child(self, node):
-        """ Inserts a child in the node.
 
-        Keyword arguments:
-        node -- node to insert a new child
-        """
-        if self.__existed_child(node.value):
-            return
-        else:
-            self.__childs.append(node)
-            return node
+class Node:
+    """ Class that represents a search tree node.
 
-    def remove_child(self, value):
-        """ Removes a child in the node.
+    A node only stores a reference to its parent and the direction of its
+    last movement, the movement list from the tree head is rebuilt from
+    the parents when value is read. Nodes do not keep their children.
+    """
+    __slots__ = ('parent', 'direction', 'depth', 'state', 'heuristic')
+
+    def __init__(self, parent=None, direction=None, state=None):
+        """ Build a node.
 
         Keyword arguments:
-        value -- value to be removed
+        parent -- parent node, None for the tree head
+        direction -- movement index in StateSpace.DIRECTIONS from the parent
+        state -- board state reached after executing the node movements
         """
-        self.__childs.remove(
-            list(filter(lambda x: x.value == value, self.__childs))[0]
-        )
-
-    def __existed_child(self, value):
-        """ Check if the value already exists in node child.
+        self.parent = parent
+        self.direction = direction
+        self.depth = 0 if parent is None else parent.depth + 1
+        # Board state reached after executing the node value movements
+        self.state = state
+        # Heuristic value of the state, when it is calculated
+        self.heuristic = None
 
-        Keyword arguments:
-        value -- value to be checked
+    @property
+    def value(self):
+        """ Returns the movement list from the tree head to the node, like:
+        ['UP', 'LEFT', 'DOWN']
         """
-        len(list(filter(lambda x: x.value == value, self.__childs))) > 0
+        movements = []
+        node = self
+        while node.parent is not None:
+            movements.append(StateSpace.DIRECTIONS[node.direction])
+            node = node.parent
+        movements.reverse()
+        return movements
@@ -0,0 +1,90 @@
+import heapq
+import itertools
+
+
+class OpenList:
+    """ Class that represents the priority queue of nodes to be visited.
+
+    Nodes are stored in a binary heap ordered by their weight f = g + h,
+    where g is the node depth and h the heuristic value. Ties are broken
+    by the lower h, then by the higher g, then by the insertion order, so
+    the search order is always deterministic.
+
+    When a state is reached again with a lower depth, the new node is just
+    pushed and the old entry is discarded when it reaches the top of the
+    heap (lazy deletion). The best known depth of each state is read from
+    the best_cost method, like TranspositionTable.cost.
+
+    With a weight w greater than 1, the weight of a node is g + w * h, as
+    in weighted A*, that finds solutions faster but at most w times longer
+    than the optimal one.
+    """
+    def __init__(self, best_cost=None, weight=1):
+        """ Build an empty open list.
+
+        Keyword arguments:
+        best_cost -- method that returns the best known depth of a state,
+                     None in order to never discard nodes
+        weight -- heuristic weight, 1 for A*
+        """
+        self.__heap = []
+        self.__best_cost = best_cost
+        self.weight = weight
+        # Insertion counter used as the last tie-breaker
+        self.__counter = itertools.count()
+
+    def __len__(self):
+        self.__discard_stale()
+        return len(self.__heap)
+
+    def push(self, node, heuristic_value):
+        """ Inserts a node in the open list.
+
+        Keyword arguments:
+        node -- tree node, its depth is used as the g cost
+        heuristic_value -- heuristic estimative of the node
+        """
+        heapq.heappush(self.__heap, (
+            node.depth + self.weight * heuristic_value,
+            heuristic_value,
+            -node.depth,
+            next(self.__counter),
+            node
+        ))
+
+    def pop(self):
+        """ Removes and returns the node with the minimum weight. """
+        self.__discard_stale()
+        return heapq.heappop(self.__heap)[-1]
+
+    def peek_weight(self):
+        """ Returns the minimum weight in the open list. """
+        self.__discard_stale()
+        return self.__heap[0][0]
+
+    def nodes(self):
+        """ Returns the nodes that are not stale, in the order they would be
+        popped.
+        """
+        return [
+            entry[-1] for entry in sorted(self.__heap)
+            if self.__best_cost is None
+            or entry[-1].depth <= self.__best_cost(entry[-1].state)
+        ]
+
+    def drain(self):
+        """ Removes every node and returns the ones that are not stale. """
+        heap, self.__heap = self.__heap, []
+        return [
+            entry[-1] for entry in heap
+            if self.__best_cost is None
+            or entry[-1].depth <= self.__best_cost(entry[-1].state)
+        ]
+
+    def __discard_stale(self):
+        """ Removes the top nodes whose state was reached with lower depth. """
+        if self.__best_cost is None:
+            return
+        heap = self.__heap
+        while heap and heap[0][-1].depth > self.__best_cost(heap[0][-1].state):
+            heapq.heappop(heap)
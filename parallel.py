@@ -0,0 +1,360 @@
+from board import Board
+from tree import Tree
+from state import StateSpace
+from heuristics import LinearConflict
+from multiprocessing import Pipe, Process, Queue
+import heapq
+import os
+
+
+def owner(state, workers):
+    """ Returns the index of the worker that owns a board state.
+
+    Keyword arguments:
+    state -- board state
+    workers -- number of workers
+    """
+    return hash((state,)) % workers
+
+
+class PartitionWorker:
+    """ Class that represents a worker process of a parallel search.
+
+    The board states are partitioned between the workers by owner, and each
+    worker keeps the visited states, the parent of each state and the open
+    list of its own partition, so duplicate detection is done by the owner
+    of each state without any shared memory. The children a worker
+    generates for its own partition are searched at once, the others are
+    sent directly to the inbox of their owners at the end of each round,
+    so the coordinator only exchanges a few numbers with each worker.
+    """
+    def __init__(self, length, state, workers, heuristic=None, index=0,
+                 inboxes=None):
+        """ Build a worker.
+
+        Keyword arguments:
+        length -- number of columns and rows of the board
+        state -- initial board state
+        workers -- number of workers
+        heuristic -- name of the Tree heuristic, like: manhattan_distance
+        index -- index of the worker partition
+        inboxes -- multiprocessing Queue of the children sent to each
+                   worker, not needed by a single worker
+        """
+        self.length = length
+        self.state = state
+        self.workers = workers
+        self.heuristic = heuristic
+        self.index = index
+        self.inboxes = inboxes
+
+    def run(self, connection):
+        """ Executes the commands received from connection until stop.
+
+        Keyword arguments:
+        connection -- worker side of a multiprocessing Pipe
+        """
+        self.__space = StateSpace.for_length(self.length)
+        if self.heuristic is not None:
+            board = Board(self.length)
+            board.load_state(self.state)
+            self.__heuristic = getattr(Tree(board), self.heuristic)
+            # Child values are updated from the parent value when the
+            # heuristic has an update method, like in Tree.A_star
+            self.__update = getattr(self.__heuristic, 'update', None)
+        # Parent state and movement direction of each visited state
+        self.__parents = {}
+        # Best known depth of each state and the heap of open states
+        self.__costs = {}
+        self.__open = []
+        # States of the next BFS level of this partition
+        self.__level = []
+        # The owner of the initial state starts the search
+        if owner(self.state, self.workers) == self.index:
+            if self.heuristic is None:
+                self.__level.append((self.state, None, None))
+            else:
+                self.__insert((self.state, 0, None, None, None))
+
+        while True:
+            command = connection.recv()
+            if command[0] == 'stop':
+                break
+            elif command[0] == 'bfs':
+                connection.send(self.__bfs_level())
+            elif command[0] == 'a_star':
+                connection.send(self.__a_star_round(*command[1:]))
+            elif command[0] == 'parent':
+                connection.send(self.__parents[command[1]])
+        connection.close()
+
+    def __exchange(self, children):
+        """ Sends the children of the other partitions to their owners and
+        returns the ones of this partition with the ones received.
+
+        Every worker sends a list, even if it is empty, to every other
+        worker in each round, so each one knows how many lists to receive.
+
+        Keyword arguments:
+        children -- list of the children of each partition
+        """
+        for index, items in enumerate(children):
+            if index != self.index:
+                self.inboxes[index].put(items)
+        received = children[self.index]
+        for _ in range(self.workers - 1):
+            received.extend(self.inboxes[self.index].get())
+        return received
+
+    def __insert(self, item):
+        """ Inserts a state in the open list if it was not reached with a
+        lower or equal depth.
+
+        Keyword arguments:
+        item -- tuple of (state, depth, parent state, direction, parent
+                heuristic value)
+        """
+        state, depth, parent, direction, parent_value = item
+        if depth < self.__costs.get(state, float('inf')):
+            self.__costs[state] = depth
+            self.__parents[state] = (parent, direction)
+            if parent is None or self.__update is None:
+                value = self.__heuristic(state)
+            else:
+                value = self.__update(parent_value, parent, state)
+            heapq.heappush(self.__open, (depth + value, value, -depth, state))
+
+    def __bfs_level(self):
+        """ Expands the new states of a breadth-first search level and
+        exchanges the children of the next level with the other workers.
+
+        Returns (goal found, new states count, next level states count).
+        """
+        space = self.__space
+        items, self.__level = self.__level, []
+        children = [[] for _ in range(self.workers)]
+        found = False
+        new_count = 0
+        for state, parent, direction in items:
+            if state in self.__parents:
+                continue
+            self.__parents[state] = (parent, direction)
+            new_count += 1
+            if state == space.goal:
+                found = True
+            for child_direction, child_state in space.successors(state):
+                if child_state != parent:
+                    children[owner(child_state, self.workers)].append(
+                        (child_state, state, child_direction))
+        self.__level = self.__exchange(children)
+        return found, new_count, len(self.__level)
+
+    def __a_star_round(self, count, limit, incumbent):
+        """ Expands up to count states with weight up to limit and lower
+        than the incumbent solution depth, then exchanges the children of
+        the other partitions with the other workers.
+
+        Returns (goal depth or None, minimum weight in the open list,
+        expanded states count).
+
+        Keyword arguments:
+        count -- maximum number of states to expand
+        limit -- maximum weight of the expanded states
+        incumbent -- depth of the best solution found by any worker
+        """
+        space = self.__space
+        costs = self.__costs
+        children = [[] for _ in range(self.workers)]
+        goal_depth = None
+        expanded = 0
+        while self.__open and expanded < count:
+            weight, value, depth, state = self.__open[0]
+            depth = -depth
+            if depth > costs[state]:
+                heapq.heappop(self.__open)
+                continue
+            # States out of the current weight limit or that can not
+            # improve the incumbent are kept
+            if weight > limit or weight >= incumbent:
+                break
+            heapq.heappop(self.__open)
+            expanded += 1
+            if state == space.goal:
+                goal_depth = depth
+                incumbent = depth
+                continue
+            parent = self.__parents[state][0]
+            for child_direction, child_state in space.successors(state):
+                if child_state != parent:
+                    item = (child_state, depth + 1, state, child_direction,
+                            value)
+                    index = owner(child_state, self.workers)
+                    # Children of this partition are searched in this round
+                    if index == self.index:
+                        self.__insert(item)
+                    else:
+                        children[index].append(item)
+        for item in self.__exchange(children):
+            self.__insert(item)
+
+        # Discard the stale states at the top to report the minimum weight
+        while self.__open and -self.__open[0][2] > costs[self.__open[0][3]]:
+            heapq.heappop(self.__open)
+        minimum = self.__open[0][0] if self.__open else float('inf')
+        return goal_depth, minimum, expanded
+
+
+class ParallelSearch:
+    """ Class that searches the solution of a single board with many worker
+    processes.
+
+    The searches are synchronous: in each round, every worker expands its
+    part of the frontier and sends the children of the other partitions
+    directly to their owners, the coordinator only sends the round limits
+    and receives the round counters. BFS expands a whole level per round.
+    A_star expands up to BATCH_SIZE states per worker and round, in
+    best-first order and with the own children searched at once, only the
+    ones with the minimum weight of the previous round, and stops when no
+    open state has a weight lower than the best solution found, so the
+    solution is optimal for admissible heuristics.
+    """
+    # Number of states expanded by each worker per A* round
+    BATCH_SIZE = 64
+
+    def __init__(self, board, workers=None):
+        """ Build a parallel search of a board.
+
+        Keyword arguments:
+        board -- initial board
+        workers -- number of worker processes, the CPU count by default
+        """
+        self.length = board.length
+        self.state = board.to_state()
+        # If the goal can be achieved, the searches return None if not
+        self.solvable = board.is_solvable()
+        # Admissible lower bound of the solution length, the manhattan
+        # distance without the empty piece, like Tree.lower_bound
+        self.lower_bound = LinearConflict.for_length(self.length).manhattan(
+            self.state)
+        self.workers = workers or os.cpu_count() or 1
+        self.size = 0
+        self.MAX_SIZE = 100000
+
+    def BFS(self):
+        """ Execute a level-synchronous parallel BFS (Breath-First Search)
+        in order to return the movement list to solve n-puzzle game.
+        """
+        # Returns None without searching if the board can not be solved
+        if not self.solvable:
+            return None
+        connections = self.__start()
+        try:
+            while self.size < self.MAX_SIZE:
+                for connection in connections:
+                    connection.send(('bfs',))
+                found = False
+                # Number of states of the next level
+                pending = 0
+                for connection in connections:
+                    goal_found, new_count, next_count = connection.recv()
+                    found = found or goal_found
+                    self.size += new_count
+                    pending += next_count
+                if found:
+                    return self.__path(connections)
+                if pending == 0:
+                    break
+            return []
+        finally:
+            self.__stop(connections)
+
+    def A_star(self, heuristic='manhattan_distance'):
+        """ Execute a parallel A* search with the states partitioned between
+        the workers in order to return the movement list to solve n-puzzle.
+
+        Keyword arguments:
+        heuristic -- name of the Tree heuristic, like: manhattan_distance
+        """
+        # Returns None without searching if the board can not be solved
+        if not self.solvable:
+            return None
+        connections = self.__start(heuristic)
+        try:
+            # Depth of the best solution found
+            incumbent = float('inf')
+            # Minimum weight in the open lists of the previous round
+            minimum = 0
+
+            while self.size < self.MAX_SIZE:
+                for connection in connections:
+                    connection.send(
+                        ('a_star', self.BATCH_SIZE, minimum, incumbent))
+                minimum = float('inf')
+                for connection in connections:
+                    goal_depth, weight, expanded = connection.recv()
+                    if goal_depth is not None and goal_depth < incumbent:
+                        incumbent = goal_depth
+                    minimum = min(minimum, weight)
+                    self.size += expanded
+                # Stops when there is no state that can improve the solution
+                if minimum >= incumbent:
+                    break
+
+            if incumbent == float('inf'):
+                return []
+            return self.__path(connections)
+        finally:
+            self.__stop(connections)
+
+    def __start(self, heuristic=None):
+        """ Starts the worker processes and returns their connections.
+
+        Keyword arguments:
+        heuristic -- name of the Tree heuristic used by the workers
+        """
+        self.size = 0
+        connections = []
+        self.__processes = []
+        # Inbox of the children sent to each worker by the other workers
+        inboxes = [Queue() for _ in range(self.workers)]
+        for index in range(self.workers):
+            connection, worker_connection = Pipe()
+            worker = PartitionWorker(
+                self.length, self.state, self.workers, heuristic, index,
+                inboxes)
+            process = Process(
+                target=worker.run, args=(worker_connection,), daemon=True)
+            process.start()
+            connections.append(connection)
+            self.__processes.append(process)
+        return connections
+
+    def __stop(self, connections):
+        """ Stops the worker processes.
+
+        Keyword arguments:
+        connections -- connections of the workers
+        """
+        for connection in connections:
+            connection.send(('stop',))
+            connection.close()
+        for process in self.__processes:
+            process.join()
+
+    def __path(self, connections):
+        """ Returns the movement list from the initial state to the goal,
+        asking the owner of each state for its parent.
+
+        Keyword arguments:
+        connections -- connections of the workers
+        """
+        space = StateSpace.for_length(self.length)
+        directions = []
+        state = space.goal
+        while state != self.state:
+            connection = connections[owner(state, self.workers)]
+            connection.send(('parent', state))
+            state, direction = connection.recv()
+            directions.append(StateSpace.DIRECTIONS[direction])
+        directions.reverse()
+        return directions
@@ -0,0 +1,201 @@
+from state import StateSpace
+from collections import deque
+import mmap
+import os
+import sys
+
+
+class PatternDatabase:
+    """ Class that represents an additive disjoint pattern database.
+
+    The pieces of the board are split into disjoint patterns. For each
+    pattern, a table stores the minimum number of movements of the pattern
+    pieces needed to put them in their goal positions, for every placement
+    of the pattern pieces. As only movements of the pattern pieces are
+    counted, the values of the disjoint patterns can be added and the sum
+    is still an admissible heuristic.
+
+    The table of a pattern is indexed by the positions of its pieces:
+        index = position(p_0) + position(p_1) * size + ...
+    and stores one byte per index. Tables are generated once by a backward
+    breadth-first search from the goal board and saved in a directory,
+    then they are memory-mapped, so they are not read or rebuilt at startup.
+    """
+    # Default disjoint patterns of each board length
+    PATTERNS = {
+        2: ((1, 2, 3),),
+        3: ((1, 2, 3, 4), (5, 6, 7, 8)),
+        4: ((1, 2, 3, 4, 5), (6, 7, 8, 9, 10), (11, 12, 13, 14, 15)),
+    }
+    # Default directory of the tables files
+    DIRECTORY = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'pdb')
+    # Table value of the placements that were not reached
+    UNKNOWN = 255
+
+    # Default pattern databases already loaded for each board length
+    __databases = {}
+
+    @classmethod
+    def for_length(cls, length):
+        """ Returns the default pattern database of a board length, loading
+        it once.
+
+        Keyword arguments:
+        length -- number of columns and rows of the board (ex: 4)
+        """
+        if length not in cls.__databases:
+            cls.__databases[length] = cls(length)
+        return cls.__databases[length]
+
+    def __init__(self, length, patterns=None, directory=None):
+        """ Load the pattern tables of a board length, building the missing
+        ones.
+
+        Keyword arguments:
+        length -- number of columns and rows of the board (ex: 4)
+        patterns -- tuple of disjoint tuples of pieces, like the PATTERNS,
+                    the PATTERNS of the length by default, ValueError is
+                    raised if there are none
+        directory -- directory of the tables files
+        """
+        if patterns is None and length not in self.PATTERNS:
+            raise ValueError(
+                'There are no default patterns for {0}x{0} boards'.format(
+                    length))
+        self.__space = StateSpace.for_length(length)
+        self.patterns = tuple(
+            tuple(pattern) for pattern in (patterns or self.PATTERNS[length])
+        )
+        self.directory = directory or self.DIRECTORY
+        # Memory-mapped table of each pattern
+        self.__tables = [self.__load(pattern) for pattern in self.patterns]
+
+    def __call__(self, state):
+        """ Returns the sum of the pattern tables values for the state.
+
+        Keyword arguments:
+        state -- board state
+        """
+        size = self.__space.size
+        # Position of each piece in the state
+        positions = [0] * size
+        for position, value in enumerate(self.__space.decode(state)):
+            positions[value] = position
+
+        total_sum = 0
+        for pattern, table in zip(self.patterns, self.__tables):
+            index = 0
+            for piece in reversed(pattern):
+                index = index * size + positions[piece]
+            total_sum += table[index]
+        return total_sum
+
+    def path(self, pattern):
+        """ Returns the file path of the pattern table.
+
+        Keyword arguments:
+        pattern -- tuple of pieces
+        """
+        name = '{}-{}.pdb'.format(
+            self.__space.length, '_'.join(str(x) for x in pattern))
+        return os.path.join(self.directory, name)
+
+    def __load(self, pattern):
+        """ Returns the memory-mapped table of a pattern, it is built and
+        saved first if its file does not exist.
+
+        Keyword arguments:
+        pattern -- tuple of pieces
+        """
+        path = self.path(pattern)
+        if not os.path.exists(path):
+            self.__save(path, self.build(pattern))
+        with open(path, 'rb') as table_file:
+            return mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __save(self, path, table):
+        """ Writes a table in path, through a temporary file in order to
+        never leave an incomplete table.
+
+        Keyword arguments:
+        path -- file path of the table
+        table -- bytearray with the table values
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary_path = '{}.{}.tmp'.format(path, os.getpid())
+        with open(temporary_path, 'wb') as table_file:
+            table_file.write(table)
+        os.replace(temporary_path, path)
+
+    def build(self, pattern):
+        """ Returns the table of a pattern as a bytearray.
+
+        The search state is the placement of the pattern pieces plus the
+        empty piece position. Moving a pattern piece costs 1 and moving any
+        other piece costs 0, so a 0-1 breadth-first search (a deque where
+        free movements go to the front) is done from the goal board. The
+        table keeps the minimum cost of each placement over every empty
+        piece position.
+
+        Keyword arguments:
+        pattern -- tuple of pieces
+        """
+        space = self.__space
+        size = space.size
+        count = len(pattern)
+        # Board positions the empty piece can move to from each position
+        neighbors = [
+            [position for _, position in space.neighbors[empty]]
+            for empty in range(size)
+        ]
+        # Index weight of each pattern piece, like: size ** i
+        weights = [size ** i for i in range(count)]
+        table_size = size ** count
+
+        # Cost of each (placement, empty position), placement * size + empty
+        costs = bytearray([self.UNKNOWN]) * (table_size * size)
+        table = bytearray([self.UNKNOWN]) * table_size
+
+        # In the goal board, each piece is in the position of its value
+        start = sum(piece * weight for piece, weight in zip(pattern, weights))
+        costs[start * size] = 0
+        to_visit = deque([(start, 0, 0)])
+
+        while to_visit:
+            placement, empty, cost = to_visit.popleft()
+            # Skip the entry if the state was reached later with lower cost
+            if costs[placement * size + empty] < cost:
+                continue
+            if cost < table[placement]:
+                table[placement] = cost
+
+            # Pattern piece of each occupied position
+            occupied = {}
+            rest = placement
+            for i in range(count):
+                rest, position = divmod(rest, size)
+                occupied[position] = i
+            for position in neighbors[empty]:
+                if position in occupied:
+                    piece = occupied[position]
+                    new_placement = (
+                        placement + (empty - position) * weights[piece])
+                    new_cost = cost + 1
+                else:
+                    new_placement = placement
+                    new_cost = cost
+                key = new_placement * size + position
+                if new_cost < costs[key]:
+                    costs[key] = new_cost
+                    if new_cost == cost:
+                        to_visit.appendleft((new_placement, position, cost))
+                    else:
+                        to_visit.append((new_placement, position, new_cost))
+        return table
+
+
+if __name__ == '__main__':
+    # Builds the default tables of the board lengths given as arguments
+    for length in sys.argv[1:]:
+        PatternDatabase.for_length(int(length))
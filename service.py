@@ -0,0 +1,353 @@
+from batch import BatchSolver
+from solver import parse_board
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+
+# Stop flag of each worker slot, set in the worker processes by start_worker
+stop_flags = None
+
+
+def start_worker(flags):
+    """ Keeps the shared stop flags in a worker process.
+
+    Keyword arguments:
+    flags -- multiprocessing RawArray with a stop flag for each slot
+    """
+    global stop_flags
+    stop_flags = flags
+
+
+def solve_cancellable(task, slot):
+    """ Solves a BatchSolver task in a worker process, stopping the search
+    when the stop flag of its slot is set.
+
+    Keyword arguments:
+    task -- tuple of (id, board length, board state, strategy, timeout)
+    slot -- index of the stop flag of the search
+    """
+    return BatchSolver.solve_task(task, lambda: stop_flags[slot] != 0)
+
+
+class Search:
+    """ Class that represents a search requested by one or more clients.
+
+    Requests of the same board and strategy that arrive while the search
+    is waiting or running share it, and the search is cancelled when no
+    client is waiting for it anymore.
+    """
+    def __init__(self, key, task, future):
+        """ Build a search.
+
+        Keyword arguments:
+        key -- (board length, board state, strategy)
+        task -- BatchSolver task of the search
+        future -- asyncio future of the search result
+        """
+        self.key = key
+        self.task = task
+        self.future = future
+        # Number of requests waiting for the result
+        self.clients = 1
+        # Stop flag slot while the search is running, None otherwise
+        self.slot = None
+        # Task that puts the search in the queue, it does not belong to
+        # any request so the search is queued while a client waits for it
+        self.enqueued = None
+
+
+class SolverService:
+    """ Class that represents an asyncio solver service.
+
+    Clients connect by TCP and send a request per line, a JSON object like:
+        {"id": 1, "board": [1, 0, 2, 3, 4, 5, 6, 7, 8], "strategy": "BFS"}
+    or just the board pieces, like: 1 0 2 3 4 5 6 7 8, and receive a JSON
+    line for each request as soon as it is solved, with the request id and
+    the BatchSolver result fields, or with an error field.
+
+    The searches run in a process pool. Requests of a board and strategy
+    that is already being searched wait for that search (coalescing).
+    Waiting searches are kept in a bounded queue, when it is full the
+    service stops reading the requests of the clients (backpressure). When
+    a client disconnects, its requests are cancelled, and so are the
+    searches that no other client is waiting for: a waiting search is
+    skipped and a running search is stopped through its stop flag.
+    """
+    def __init__(self, strategy='A_STAR_MANHATTAN', workers=None,
+                 queue_size=100, timeout=None):
+        """ Build a solver service.
+
+        Keyword arguments:
+        strategy -- default strategy, like the BatchSolver.STRATEGIES keys
+        workers -- number of worker processes, the CPU count by default
+        queue_size -- maximum number of searches waiting for a worker
+        timeout -- maximum seconds of each search, None for no limit
+        """
+        if strategy not in BatchSolver.STRATEGIES:
+            raise ValueError('Unknown strategy: {}'.format(strategy))
+        self.strategy = strategy
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.timeout = timeout
+        # Number of requests that shared a search with an earlier request
+        self.coalesced = 0
+        # Number of searches cancelled because their clients have gone
+        self.cancelled = 0
+        # Searches waiting or running, by key
+        self.__searches = {}
+
+    async def serve(self, host='127.0.0.1', port=8765, ready=None):
+        """ Serves the clients until the task is cancelled.
+
+        Keyword arguments:
+        host -- address to listen on
+        port -- TCP port to listen on, 0 for any free port
+        ready -- method called with the server sockets when it is listening
+        """
+        self.__flags = multiprocessing.RawArray('b', self.workers)
+        self.__queue = asyncio.Queue(self.queue_size)
+        with ProcessPoolExecutor(
+                max_workers=self.workers, initializer=start_worker,
+                initargs=(self.__flags,)) as executor:
+            # A dispatcher for each worker, each one with its own stop flag
+            dispatchers = [
+                asyncio.ensure_future(self.__dispatch(executor, slot))
+                for slot in range(self.workers)
+            ]
+            server = await asyncio.start_server(self.__handle, host, port)
+            try:
+                if ready is not None:
+                    ready(server.sockets)
+                async with server:
+                    await server.serve_forever()
+            finally:
+                for dispatcher in dispatchers:
+                    dispatcher.cancel()
+                # Stops the running searches before waiting for the pool
+                for slot in range(self.workers):
+                    self.__flags[slot] = 1
+
+    async def solve(self, board, strategy=None, identifier=None):
+        """ Returns the result of a board, sharing the search with the
+        other requests of the same board and strategy.
+
+        Keyword arguments:
+        board -- initial board
+        strategy -- strategy name, the service strategy by default
+        identifier -- request id, returned in the result
+        """
+        search = self.__join(board, strategy)
+        try:
+            # Waits for a free place in the queue (backpressure), without
+            # cancelling the enqueue task that other clients may rely on
+            await asyncio.wait([search.enqueued])
+            result = await asyncio.shield(search.future)
+        except asyncio.CancelledError:
+            self.__leave(search)
+            raise
+        return dict(result, id=identifier)
+
+    def __join(self, board, strategy=None):
+        """ Returns the search of a board and strategy with a new client,
+        starting it if there is none.
+
+        Keyword arguments:
+        board -- initial board
+        strategy -- strategy name, the service strategy by default
+        """
+        strategy = strategy or self.strategy
+        if strategy not in BatchSolver.STRATEGIES:
+            raise ValueError('Unknown strategy: {}'.format(strategy))
+        state = board.to_state()
+        key = (board.length, state, strategy)
+        search = self.__searches.get(key)
+        if search is not None:
+            search.clients += 1
+            self.coalesced += 1
+            return search
+        search = Search(
+            key, (None, board.length, state, strategy, self.timeout),
+            asyncio.get_running_loop().create_future())
+        search.enqueued = asyncio.ensure_future(self.__queue.put(search))
+        self.__searches[key] = search
+        return search
+
+    def __leave(self, search):
+        """ Removes a client of a search, cancelling the search if it was
+        its last client.
+
+        Keyword arguments:
+        search -- search of the client
+        """
+        search.clients -= 1
+        if search.clients > 0 or search.future.done():
+            return
+        self.cancelled += 1
+        search.future.cancel()
+        # Frees its place in the queue if it is still waiting for one
+        search.enqueued.cancel()
+        if self.__searches.get(search.key) is search:
+            del self.__searches[search.key]
+        if search.slot is not None:
+            self.__flags[search.slot] = 1
+
+    async def __dispatch(self, executor, slot):
+        """ Runs the searches of the queue in the process pool, one at a
+        time.
+
+        Keyword arguments:
+        executor -- process pool
+        slot -- index of the stop flag of the searches of this dispatcher
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            search = await self.__queue.get()
+            # Skips the searches without clients
+            if search.future.done():
+                continue
+            self.__flags[slot] = 0
+            search.slot = slot
+            try:
+                result = await loop.run_in_executor(
+                    executor, solve_cancellable, search.task, slot)
+                if not search.future.done():
+                    search.future.set_result(result)
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                if not search.future.done():
+                    search.future.set_exception(error)
+            finally:
+                search.slot = None
+                if self.__searches.get(search.key) is search:
+                    del self.__searches[search.key]
+
+    async def __handle(self, reader, writer):
+        """ Answers the requests of a client connection, cancelling them
+        when the client disconnects.
+
+        A request line is only read when the search of the previous one is
+        in the queue, so a full queue stops reading (backpressure).
+
+        Keyword arguments:
+        reader -- asyncio StreamReader of the connection
+        writer -- asyncio StreamWriter of the connection
+        """
+        # Requests waiting for their result and their searches
+        requests = {}
+        number = 0
+        try:
+            # The writer is closed when an answer can not be written because
+            # the client has gone, the lines still buffered are not read
+            while not writer.is_closing():
+                line = await reader.readline()
+                if not line:
+                    break
+                line = line.decode().strip()
+                if not line:
+                    continue
+                number += 1
+                identifier = number
+                try:
+                    if line.startswith('{'):
+                        request = json.loads(line)
+                        identifier = request.get('id', number)
+                        board = parse_board(
+                            ' '.join(str(x) for x in request['board']))
+                        strategy = request.get('strategy')
+                    else:
+                        board = parse_board(line)
+                        strategy = None
+                    search = self.__join(board, strategy)
+                except Exception as error:
+                    # Invalid requests
+                    await self.__write(
+                        writer, {'id': identifier, 'error': str(error)})
+                    continue
+                answer = asyncio.ensure_future(
+                    self.__answer(search, identifier, writer))
+                requests[answer] = search
+                answer.add_done_callback(
+                    lambda done: requests.pop(done, None))
+                # Waits for a free place in the queue before reading more
+                await asyncio.wait([search.enqueued])
+        except ConnectionError:
+            pass
+        finally:
+            # The client has gone, so nobody waits for its requests
+            for answer, search in list(requests.items()):
+                answer.cancel()
+                self.__leave(search)
+            writer.close()
+
+    async def __answer(self, search, identifier, writer):
+        """ Waits for the result of a request and writes its result line.
+
+        Keyword arguments:
+        search -- search of the request
+        identifier -- request id
+        writer -- asyncio StreamWriter of the connection
+        """
+        try:
+            response = dict(
+                await asyncio.shield(search.future), id=identifier)
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:
+            # Failed searches
+            response = {'id': identifier, 'error': str(error)}
+        try:
+            await self.__write(writer, response)
+        except ConnectionError:
+            # The client has gone, its connection handler cancels the
+            # other requests
+            pass
+
+    async def __write(self, writer, response):
+        """ Writes a response line.
+
+        Keyword arguments:
+        writer -- asyncio StreamWriter of the connection
+        response -- JSON object of the response
+        """
+        writer.write((json.dumps(response) + '\n').encode())
+        await writer.drain()
+
+
+def main(arguments=None):
+    """ Runs the solver service until it is interrupted.
+
+    Keyword arguments:
+    arguments -- command line arguments, sys.argv by default
+    """
+    parser = argparse.ArgumentParser(description='n-puzzle solver service.')
+    parser.add_argument('--host', default='127.0.0.1', help='address')
+    parser.add_argument('--port', type=int, default=8765, help='TCP port')
+    parser.add_argument(
+        '-s', '--strategy', default='A_STAR_MANHATTAN',
+        choices=sorted(BatchSolver.STRATEGIES), help='default strategy')
+    parser.add_argument(
+        '-w', '--workers', type=int, default=None,
+        help='number of worker processes, the CPU count by default')
+    parser.add_argument(
+        '-q', '--queue-size', type=int, default=100,
+        help='maximum number of searches waiting for a worker')
+    parser.add_argument(
+        '-t', '--timeout', type=float, default=None,
+        help='maximum seconds of each search')
+    options = parser.parse_args(arguments)
+
+    service = SolverService(
+        options.strategy, options.workers, options.queue_size,
+        options.timeout)
+    try:
+        asyncio.run(service.serve(options.host, options.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
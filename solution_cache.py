@@ -0,0 +1,252 @@
+from state import StateSpace
+from tree import Tree
+from collections import OrderedDict
+import sqlite3
+import time
+
+
+class SolutionCache:
+    """ Class that stores optimal solutions by board state.
+
+    Solutions are stored in a SQLite file and the most recently used ones
+    are also kept in memory. A board and its transpose (the board mirrored
+    by its main diagonal) have the same solution with UP/LEFT and
+    DOWN/RIGHT exchanged, because the goal board is its own transpose. So
+    the key of a board is its canonical state, the lowest state of the
+    board and its transpose, and the solution is stored for that state.
+
+    When a solution is stored, the solution of every state of its path is
+    stored too: the movements left after each state are an optimal
+    solution for that state.
+
+    The file keeps at most max_size solutions, the least recently used
+    ones are removed when it is full. The file is the reference: a stored
+    solution only replaces a longer one, and the memory only keeps what
+    was read from the file. The uses of the solutions in memory are
+    written to the file before removing solutions, so they are not
+    removed as if they were not used.
+    """
+    # Direction index of each direction index in the transposed board:
+    # UP <-> LEFT and DOWN <-> RIGHT
+    TRANSPOSED = (3, 2, 1, 0)
+
+    def __init__(self, path, memory_size=10000, max_size=1000000):
+        """ Open a solution cache, creating its file if it does not exist.
+
+        Keyword arguments:
+        path -- path of the SQLite file
+        memory_size -- maximum number of solutions kept in memory
+        max_size -- maximum number of solutions kept in the file
+        """
+        self.memory_size = memory_size
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        # Solutions in memory by key, in least recently used order
+        self.__memory = OrderedDict()
+        # Last use time of the keys used from memory, not written yet
+        self.__accessed = {}
+        # Position in the transposed board of each board position
+        self.__transposed_positions = {}
+        self.__connection = sqlite3.connect(path)
+        self.__connection.execute(
+            'CREATE TABLE IF NOT EXISTS solutions ('
+            'key TEXT PRIMARY KEY, movements BLOB, accessed REAL)')
+        self.__connection.execute(
+            'CREATE INDEX IF NOT EXISTS solutions_accessed '
+            'ON solutions (accessed)')
+        self.__connection.commit()
+
+    def get(self, length, state):
+        """ Returns the stored solution of a board state, or None.
+
+        Keyword arguments:
+        length -- number of columns and rows of the board
+        state -- board state
+        """
+        key, transposed = self.__key(length, state)
+        movements = self.__memory.get(key)
+        if movements is not None:
+            self.__memory.move_to_end(key)
+            self.__accessed[key] = time.time()
+        else:
+            row = self.__connection.execute(
+                'SELECT movements FROM solutions WHERE key = ?',
+                (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            movements = bytes(row[0])
+            self.__connection.execute(
+                'UPDATE solutions SET accessed = ? WHERE key = ?',
+                (time.time(), key))
+            self.__connection.commit()
+            self.__remember(key, movements)
+
+        self.hits += 1
+        if transposed:
+            movements = [self.TRANSPOSED[x] for x in movements]
+        return [StateSpace.DIRECTIONS[x] for x in movements]
+
+    def put(self, length, state, movements):
+        """ Stores an optimal solution of a board state and the solutions
+        of every state of its path.
+
+        Keyword arguments:
+        length -- number of columns and rows of the board
+        state -- board state
+        movements -- optimal movement list, like: ['UP', 'LEFT']
+        """
+        space = StateSpace.for_length(length)
+        directions = [StateSpace.DIRECTIONS.index(x) for x in movements]
+        rows = []
+        accessed = time.time()
+        for index in range(len(directions) + 1):
+            key, transposed = self.__key(length, state)
+            suffix = directions[index:]
+            if transposed:
+                suffix = [self.TRANSPOSED[x] for x in suffix]
+            rows.append((key, bytes(suffix), accessed))
+            # Read again from the file, that may keep a shorter solution
+            self.__memory.pop(key, None)
+            self.__accessed.pop(key, None)
+            if index < len(directions):
+                state = space.move(state, directions[index])
+
+        # A solution only replaces a longer one, but it is used anyway
+        self.__connection.executemany(
+            'INSERT INTO solutions VALUES (?, ?, ?) '
+            'ON CONFLICT (key) DO UPDATE SET '
+            'movements = CASE WHEN length(excluded.movements) < '
+            'length(movements) THEN excluded.movements ELSE movements END, '
+            'accessed = excluded.accessed', rows)
+        self.__evict()
+        self.__connection.commit()
+
+    def solve(self, board, strategy, optimal=False):
+        """ Returns the solution of a board from the cache, or solves it
+        with strategy and stores the solution if it is known to be optimal.
+
+        A solution is known to be optimal if it achieves the goal, the
+        search was not stopped by its deadline and either the search
+        proved it (its anytime bound is 1 or its length is the tree lower
+        bound) or optimal is True and no weaker bound was reported.
+
+        Keyword arguments:
+        board -- initial board
+        strategy -- method that receives a Tree and returns a movement
+                    list, like: lambda tree: tree.BFS()
+        optimal -- if strategy returns optimal solutions, like BFS, A* and
+                   IDA* with an admissible heuristic, but not DFS
+        """
+        state = board.to_state()
+        movements = self.get(board.length, state)
+        if movements is not None:
+            return movements
+        decision_tree = Tree(board)
+        movements = strategy(decision_tree)
+        if self.__is_optimal(board, decision_tree, movements, optimal):
+            self.put(board.length, state, movements)
+        return movements
+
+    def close(self):
+        """ Writes the uses of the solutions in memory and closes the cache
+        file.
+        """
+        self.__write_accessed()
+        self.__connection.commit()
+        self.__connection.close()
+
+    def __is_optimal(self, board, decision_tree, movements, optimal):
+        """ Checks if the movements returned by a search are an optimal
+        solution of the board, see solve.
+
+        Keyword arguments:
+        board -- initial board
+        decision_tree -- Tree of the search
+        movements -- movement list returned by the search
+        optimal -- if the strategy returns optimal solutions
+        """
+        if movements is None or decision_tree.timed_out:
+            return False
+        # Only solutions that achieve the goal are stored
+        space = StateSpace.for_length(board.length)
+        final_state = board.to_state()
+        for movement in movements:
+            final_state = space.move(
+                final_state, StateSpace.DIRECTIONS.index(movement))
+        if final_state != space.goal:
+            return False
+        if len(movements) == decision_tree.lower_bound:
+            return True
+        if decision_tree.suboptimality is not None:
+            return decision_tree.suboptimality <= 1
+        return optimal
+
+    def __key(self, length, state):
+        """ Returns the key of a board state and if it is the transposed
+        board key.
+
+        Keyword arguments:
+        length -- number of columns and rows of the board
+        state -- board state
+        """
+        transposed_state = self.__transpose(length, state)
+        if transposed_state < state:
+            return '{}:{:x}'.format(length, transposed_state), True
+        return '{}:{:x}'.format(length, state), False
+
+    def __transpose(self, length, state):
+        """ Returns the state of the board mirrored by its main diagonal.
+
+        The piece in (x, y) goes to (y, x) and its value is replaced by the
+        goal value of (y, x), so the goal board is kept the same.
+
+        Keyword arguments:
+        length -- number of columns and rows of the board
+        state -- board state
+        """
+        space = StateSpace.for_length(length)
+        if length not in self.__transposed_positions:
+            self.__transposed_positions[length] = [
+                (position % length) * length + position // length
+                for position in range(space.size)
+            ]
+        transposed = self.__transposed_positions[length]
+        pieces = [0] * space.size
+        for position, value in enumerate(space.decode(state)):
+            pieces[transposed[position]] = transposed[value]
+        return space.encode(pieces)
+
+    def __remember(self, key, movements):
+        """ Keeps a solution in memory, forgetting the least recently used
+        solution if the memory is full.
+
+        Keyword arguments:
+        key -- board key
+        movements -- bytes with the direction indexes
+        """
+        self.__memory[key] = movements
+        self.__memory.move_to_end(key)
+        if len(self.__memory) > self.memory_size:
+            self.__memory.popitem(last=False)
+
+    def __write_accessed(self):
+        """ Writes the last use time of the keys used from memory. """
+        self.__connection.executemany(
+            'UPDATE solutions SET accessed = ? WHERE key = ?',
+            [(accessed, key) for key, accessed in self.__accessed.items()])
+        self.__accessed.clear()
+
+    def __evict(self):
+        """ Removes the least recently used solutions of the file while it
+        has more than max_size solutions.
+        """
+        self.__write_accessed()
+        count = self.__connection.execute(
+            'SELECT COUNT(*) FROM solutions').fetchone()[0]
+        if count > self.max_size:
+            self.__connection.execute(
+                'DELETE FROM solutions WHERE key IN ('
+                'SELECT key FROM solutions ORDER BY accessed LIMIT ?)',
+                (count - self.max_size,))
@@ -0,0 +1,175 @@
+from board import Board
+from batch import BatchSolver
+from state import StateSpace
+import argparse
+import contextlib
+import csv
+import json
+import math
+import sys
+
+
+def parse_board(line):
+    """ Returns the board of a line with its piece values ordered by board
+    position, separated by spaces or commas, like: 1 0 2 3 4 5 6 7 8
+
+    Raises ValueError if the values are not a square board permutation.
+
+    Keyword arguments:
+    line -- text line
+    """
+    pieces = [int(value) for value in line.replace(',', ' ').split()]
+    length = math.isqrt(len(pieces))
+    if length < 2 or length * length != len(pieces):
+        raise ValueError('A board must have a square number of pieces')
+    if sorted(pieces) != list(range(len(pieces))):
+        raise ValueError('A board must have the pieces 0 to {}'.format(
+            len(pieces) - 1))
+    board = Board(length)
+    board.load_state(StateSpace.for_length(length).encode(pieces))
+    return board
+
+
+def read_boards(lines, errors=sys.stderr):
+    """ Yields the board of each line, skipping empty lines and comments
+    (lines starting with #). Invalid lines are reported to errors.
+
+    Keyword arguments:
+    lines -- iterable of text lines, like an opened file
+    errors -- file where the invalid lines are reported
+    """
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        try:
+            yield parse_board(line)
+        except ValueError as error:
+            errors.write('line {}: {}\n'.format(number, error))
+
+
+class StreamSolver:
+    """ Class that solves a stream of boards and writes each result as soon
+    as its board is solved.
+
+    Boards are read, solved and written one at a time through generators,
+    so the memory does not grow with the input length. With more than one
+    worker the boards are solved by a BatchSolver, that keeps a bounded
+    number of boards in progress and yields them as they finish, so the
+    results may not be in the input order; the id of a result is the index
+    of its board in the input.
+    """
+    # Result fields written for each board, see BatchSolver for its values
+    FIELDS = ('id', 'length', 'state', 'strategy', 'solution', 'size', 'time',
+              'timed_out', 'solvable', 'lower_bound', 'error')
+
+    def __init__(self, strategy='A_STAR_MANHATTAN', workers=1, timeout=None):
+        """ Build a stream solver.
+
+        Keyword arguments:
+        strategy -- strategy name, like the BatchSolver.STRATEGIES keys
+        workers -- number of worker processes, 1 to solve in this process
+        timeout -- maximum seconds of search for each board, None for no limit
+        """
+        if strategy not in BatchSolver.STRATEGIES:
+            raise ValueError('Unknown strategy: {}'.format(strategy))
+        self.strategy = strategy
+        self.workers = workers
+        self.timeout = timeout
+
+    def solve(self, boards):
+        """ Yields the result of each board as it is solved.
+
+        Keyword arguments:
+        boards -- iterable of Board objects
+        """
+        if self.workers > 1:
+            yield from BatchSolver(self.workers, self.timeout).solve(
+                boards, [self.strategy])
+            return
+        for identifier, board in enumerate(boards):
+            yield BatchSolver.solve_task((
+                identifier, board.length, board.to_state(), self.strategy,
+                self.timeout))
+
+    def write(self, results, output, output_format='json', errors=sys.stderr):
+        """ Writes each result as a line of output, flushing it after each
+        line. Returns the number of written results.
+
+        The boards that could not be solved, like a board length that the
+        strategy does not support, are written with their error too, and
+        the error is reported in errors, so the other boards go on.
+
+        Keyword arguments:
+        results -- iterable of result dicts
+        output -- opened text file
+        output_format -- json for a JSON object per line, or csv
+        errors -- opened text file where the failed boards are reported
+        """
+        count = 0
+        if output_format == 'csv':
+            writer = csv.writer(output, lineterminator='\n')
+            writer.writerow(self.FIELDS)
+        for result in results:
+            if result['error'] is not None:
+                errors.write('Board {}: {}\n'.format(
+                    result['id'], result['error']))
+            if output_format == 'csv':
+                solution = result['solution']
+                result = dict(result, solution=(
+                    '' if solution is None else ' '.join(solution)))
+                writer.writerow([result[field] for field in self.FIELDS])
+            else:
+                output.write(json.dumps(
+                    {field: result[field] for field in self.FIELDS}) + '\n')
+            output.flush()
+            count += 1
+        return count
+
+
+def main(arguments=None):
+    """ Solves the boards of a file or of stdin, writing a result line for
+    each board.
+
+    Keyword arguments:
+    arguments -- command line arguments, sys.argv by default
+    """
+    parser = argparse.ArgumentParser(
+        description='Solves n-puzzle boards, one board per input line.')
+    parser.add_argument(
+        'input', nargs='?', default='-',
+        help='file with a board per line, stdin by default')
+    parser.add_argument(
+        '-o', '--output', default='-',
+        help='file where the results are written, stdout by default')
+    parser.add_argument(
+        '-f', '--format', choices=('json', 'csv'), default='json',
+        help='format of the result lines')
+    parser.add_argument(
+        '-s', '--strategy', default='A_STAR_MANHATTAN',
+        choices=sorted(BatchSolver.STRATEGIES), help='search strategy')
+    parser.add_argument(
+        '-w', '--workers', type=int, default=1,
+        help='number of worker processes')
+    parser.add_argument(
+        '-t', '--timeout', type=float, default=None,
+        help='maximum seconds of search for each board')
+    options = parser.parse_args(arguments)
+
+    stream_solver = StreamSolver(
+        options.strategy, options.workers, options.timeout)
+    # Only the opened files are closed, not stdin and stdout
+    with contextlib.ExitStack() as files:
+        input_file = sys.stdin
+        if options.input != '-':
+            input_file = files.enter_context(open(options.input))
+        output_file = sys.stdout
+        if options.output != '-':
+            output_file = files.enter_context(
+                open(options.output, 'w', newline=''))
+        results = stream_solver.solve(read_boards(input_file))
+        stream_solver.write(results, output_file, options.format)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+class StateSpace:
+    """ Class that represents the compact board states of a board length.
+
+    A board state is a single integer where each board position uses a
+    fixed number of bits to store its piece value, and the position of the
+    empty piece is stored after the pieces:
+     (board)          (state with 4 bits per piece, position 0 first)
+      [1][0][2]
+      [3][4][5]   =>  empty position | 8 | 7 | 6 | 5 | 4 | 3 | 2 | 0 | 1
+      [6][7][8]
+
+    As the empty piece value is 0, a movement only needs to move the piece
+    value between two positions and to update the empty position bits.
+    States are plain integers, so they are hashable and cheap to store.
+    """
+    # The movements of the empty piece, a movement is stored as its index
+    DIRECTIONS = ('UP', 'DOWN', 'RIGHT', 'LEFT')
+    # The inverse movement index of each movement index
+    INVERSE = (1, 0, 3, 2)
+    # The x and y direction of each movement index
+    OFFSETS = ((-1, 0), (1, 0), (0, 1), (0, -1))
+
+    # State spaces already built for each board length
+    __spaces = {}
+
+    @classmethod
+    def for_length(cls, length):
+        """ Returns the state space of a board length, building it once.
+
+        Keyword arguments:
+        length -- number of columns and rows of the board (ex: 3)
+        """
+        if length not in cls.__spaces:
+            cls.__spaces[length] = cls(length)
+        return cls.__spaces[length]
+
+    def __init__(self, length):
+        """ Build the state space and its movement tables.
+
+        Keyword arguments:
+        length -- number of columns and rows of the board (ex: 3)
+        """
+        # Number of rows or columns, like: 3
+        self.length = length
+        # Number of board positions, like: 3x3 = 9
+        self.size = length * length
+        # Number of bits used by each piece, like: 4 bits for 0..15
+        self.bits = max(1, (self.size - 1).bit_length())
+        # Mask that selects a single piece value
+        self.mask = (1 << self.bits) - 1
+        # Position of the empty position bits in the state
+        self.empty_shift = self.bits * self.size
+        # For each empty position, the tuple of (direction, position) pairs
+        # that the empty piece can move to
+        self.neighbors = tuple(
+            self.__neighbors(position) for position in range(self.size)
+        )
+        # The state that we would like to achieve
+        self.goal = self.encode(range(self.size))
+
+    def encode(self, pieces):
+        """ Returns the state of a sequence of pieces.
+
+        Keyword arguments:
+        pieces -- piece values ordered by board position (ex: [1, 0, 2, ...])
+        """
+        state = 0
+        empty = 0
+        for position, value in enumerate(pieces):
+            value = int(value)
+            if value == 0:
+                empty = position
+            state |= value << (position * self.bits)
+        return state | (empty << self.empty_shift)
+
+    def decode(self, state):
+        """ Returns the list of pieces ordered by board position.
+
+        Keyword arguments:
+        state -- board state
+        """
+        return [
+            (state >> (position * self.bits)) & self.mask
+            for position in range(self.size)
+        ]
+
+    def empty(self, state):
+        """ Returns the position of the empty piece in the state.
+
+        Keyword arguments:
+        state -- board state
+        """
+        return state >> self.empty_shift
+
+    def piece(self, state, position):
+        """ Returns the piece value in a position of the state.
+
+        Keyword arguments:
+        state -- board state
+        position -- board position, like: x * length + y
+        """
+        return (state >> (position * self.bits)) & self.mask
+
+    def move(self, state, direction):
+        """ Returns the state after moving the empty piece, or None if the
+        movement is not valid.
+
+        Keyword arguments:
+        state -- board state
+        direction -- movement index in DIRECTIONS
+        """
+        empty = state >> self.empty_shift
+        for neighbor_direction, position in self.neighbors[empty]:
+            if neighbor_direction == direction:
+                return self.__swap(state, empty, position)
+        return None
+
+    def successors(self, state):
+        """ Returns a list of (direction, state) pairs for each valid
+        movement of the empty piece.
+
+        Keyword arguments:
+        state -- board state
+        """
+        empty = state >> self.empty_shift
+        return [
+            (direction, self.__swap(state, empty, position))
+            for direction, position in self.neighbors[empty]
+        ]
+
+    def is_solvable(self, state):
+        """ Checks if the goal can be achieved from the state.
+
+        A movement of the empty piece keeps the parity of the inversions
+        count (pairs of pieces, without the empty piece, in reverse order)
+        when the length is odd. When the length is even, a vertical movement
+        changes the inversions parity and the empty piece row, so the
+        parity of their sum is kept. The goal has no inversions and the
+        empty piece in the first row, so the state is solvable if that
+        parity is even.
+
+        Keyword arguments:
+        state -- board state
+        """
+        pieces = [value for value in self.decode(state) if value != 0]
+        inversions = 0
+        for i, value in enumerate(pieces):
+            for other in pieces[i + 1:]:
+                if other < value:
+                    inversions += 1
+        if self.length % 2 == 0:
+            inversions += self.empty(state) // self.length
+        return inversions % 2 == 0
+
+    def __swap(self, state, empty, position):
+        """ Returns the state with the empty piece moved to position.
+
+        Keyword arguments:
+        state -- board state
+        empty -- position of the empty piece
+        position -- position of the piece that goes to the empty position
+        """
+        shift = position * self.bits
+        value = (state >> shift) & self.mask
+        return (
+            state
+            - (value << shift)
+            + (value << (empty * self.bits))
+            + ((position - empty) << self.empty_shift)
+        )
+
+    def __neighbors(self, position):
+        """ Returns the (direction, position) pairs for the valid movements
+        of an empty piece in position.
+
+        Keyword arguments:
+        position -- board position, like: x * length + y
+        """
+        x, y = divmod(position, self.length)
+        neighbors = []
+        for direction, (offset_x, offset_y) in enumerate(self.OFFSETS):
+            new_x, new_y = x + offset_x, y + offset_y
+            if 0 <= new_x < self.length and 0 <= new_y < self.length:
+                neighbors.append((direction, new_x * self.length + new_y))
+        return tuple(neighbors)
@@ -0,0 +1,291 @@
+from board import Board
+from checkpoint import Checkpoint
+from distance_table import DistanceTable
+from service import SolverService
+from solution_cache import SolutionCache
+from state import StateSpace
+from tree import Tree
+import asyncio
+import os
+import random
+import tempfile
+import unittest
+
+
+def random_boards(length, count, seed=2017):
+    """ Returns a list of solvable boards made by seeded random movements.
+
+    Keyword arguments:
+    length -- number of columns and rows of the board
+    count -- number of boards
+    seed -- seed of the random movements
+    """
+    generator = random.Random(seed)
+    boards = []
+    for _ in range(count):
+        board = Board(length)
+        board.randomize(generator.randint(10, 60), generator)
+        boards.append(board)
+    return boards
+
+
+def final_state(board, movements):
+    """ Returns the state of a board after a movement list, or None if a
+    movement is not valid.
+
+    Keyword arguments:
+    board -- initial board
+    movements -- movement list, like: ['UP', 'LEFT']
+    """
+    space = StateSpace.for_length(board.length)
+    state = board.to_state()
+    for movement in movements:
+        if state is None:
+            break
+        state = space.move(state, StateSpace.DIRECTIONS.index(movement))
+    return state
+
+
+class StrategiesTest(unittest.TestCase):
+    """ Compares the solutions of the strategies with the exact 3x3 solution
+    lengths of the DistanceTable.
+    """
+    # Strategies that return optimal solutions, by name
+    OPTIMAL = {
+        'BFS': lambda tree: tree.BFS(),
+        'A_star': lambda tree: tree.A_star(tree.manhattan_distance),
+        'A_star linear_conflict':
+            lambda tree: tree.A_star(tree.linear_conflict),
+        'A_star walking_distance':
+            lambda tree: tree.A_star(tree.walking_distance),
+        'A_star pattern_database':
+            lambda tree: tree.A_star(tree.pattern_database),
+        'IDA_star': lambda tree: tree.IDA_star(tree.linear_conflict),
+        'bidirectional_BFS': lambda tree: tree.bidirectional_BFS(),
+        'bidirectional_A_star':
+            lambda tree: tree.bidirectional_A_star(tree.manhattan_distance),
+        'SMA_star': lambda tree: tree.SMA_star(tree.manhattan_distance),
+        'exact': lambda tree: tree.exact(),
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        cls.table = DistanceTable.for_length(3)
+        cls.boards = random_boards(3, 12)
+
+    def test_optimal(self):
+        """ The optimal strategies return solutions of the exact length. """
+        for board in self.boards:
+            distance = self.table.distance(board.to_state())
+            for name, strategy in self.OPTIMAL.items():
+                with self.subTest(strategy=name, state=board.to_state()):
+                    decision_tree = Tree(board)
+                    movements = strategy(decision_tree)
+                    self.assertEqual(
+                        final_state(board, movements),
+                        StateSpace.for_length(3).goal)
+                    self.assertEqual(len(movements), distance)
+                    self.assertLessEqual(decision_tree.lower_bound, distance)
+
+    def test_unsolvable(self):
+        """ The strategies return None for an unsolvable board. """
+        board = Board(3)
+        board.load_state(StateSpace.for_length(3).encode(
+            [0, 2, 1, 3, 4, 5, 6, 7, 8]))
+        for name, strategy in self.OPTIMAL.items():
+            with self.subTest(strategy=name):
+                self.assertIsNone(strategy(Tree(board)))
+
+    def test_anytime_bound(self):
+        """ Each anytime solution is shorter than the previous one and the
+        last one is within the reported suboptimality bound.
+        """
+        for board in self.boards:
+            distance = self.table.distance(board.to_state())
+            with self.subTest(state=board.to_state()):
+                decision_tree = Tree(board)
+                movements = decision_tree.anytime_A_star(
+                    decision_tree.linear_conflict)
+                lengths = [x['length'] for x in decision_tree.solutions]
+                self.assertEqual(lengths, sorted(lengths, reverse=True))
+                self.assertEqual(
+                    final_state(board, movements),
+                    StateSpace.for_length(3).goal)
+                self.assertLessEqual(
+                    len(movements),
+                    decision_tree.suboptimality * distance + 1e-9)
+
+    def test_sma_star_memory_limit(self):
+        """ SMA* keeps its estimated memory under the limit and still
+        reaches the goal.
+        """
+        board = Board(4)
+        board.randomize(200, random.Random(9))
+        for memory_limit in (20000, 100000):
+            with self.subTest(memory_limit=memory_limit):
+                decision_tree = Tree(board)
+                decision_tree.MAX_SIZE = 50000
+                movements = decision_tree.SMA_star(
+                    decision_tree.manhattan_distance, memory_limit)
+                self.assertLessEqual(decision_tree.peak_memory, memory_limit)
+                if movements:
+                    self.assertEqual(
+                        final_state(board, movements),
+                        StateSpace.for_length(4).goal)
+
+    def test_exact_length(self):
+        """ exact raises ValueError for boards without a distance table. """
+        with self.assertRaises(ValueError):
+            Tree(Board(4)).exact()
+
+
+class CheckpointTest(unittest.TestCase):
+    """ Resumes searches stopped at MAX_SIZE from their checkpoints. """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'search.bin')
+        self.board = Board(4)
+        self.board.randomize(200, random.Random(7))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_resume(self):
+        """ A resumed search returns the same solution length as a search
+        that never stopped.
+        """
+        strategies = {
+            'A_star': lambda tree: tree.A_star(tree.linear_conflict),
+            'A_star walking_distance':
+                lambda tree: tree.A_star(tree.walking_distance),
+        }
+        for name, strategy in strategies.items():
+            with self.subTest(strategy=name):
+                expected = strategy(Tree(self.board))
+                decision_tree = Tree(self.board)
+                decision_tree.MAX_SIZE = 300
+                decision_tree.checkpoint_path = self.path
+                self.assertEqual(strategy(decision_tree), [])
+                checkpoint = Checkpoint.load(self.path)
+                movements = Tree(self.board).resume(checkpoint)
+                self.assertEqual(len(movements), len(expected))
+                self.assertEqual(
+                    final_state(self.board, movements),
+                    StateSpace.for_length(4).goal)
+                os.remove(self.path)
+
+    def test_other_board(self):
+        """ A checkpoint can not be resumed by the tree of other board. """
+        decision_tree = Tree(self.board)
+        decision_tree.MAX_SIZE = 300
+        decision_tree.checkpoint_path = self.path
+        decision_tree.BFS()
+        with self.assertRaises(ValueError):
+            Tree(Board(4)).resume(Checkpoint.load(self.path))
+
+
+class SolutionCacheTest(unittest.TestCase):
+    """ Stores and reads solutions of a SolutionCache file. """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = SolutionCache(
+            os.path.join(self.directory.name, 'cache.db'), memory_size=4)
+        self.board = random_boards(3, 1, seed=11)[0]
+        self.solution = DistanceTable.for_length(3).solve(
+            self.board.to_state())
+
+    def tearDown(self):
+        self.cache.close()
+        self.directory.cleanup()
+
+    def longer_solution(self):
+        """ Returns a solution of the board two movements longer than the
+        optimal one.
+        """
+        space = StateSpace.for_length(3)
+        direction, _ = space.successors(self.board.to_state())[0]
+        return ([StateSpace.DIRECTIONS[direction],
+                 StateSpace.DIRECTIONS[StateSpace.INVERSE[direction]]]
+                + self.solution)
+
+    def test_put_get(self):
+        """ A stored solution is read for its board, its path states and
+        its transposed board.
+        """
+        state = self.board.to_state()
+        self.assertIsNone(self.cache.get(3, state))
+        self.cache.put(3, state, self.solution)
+        self.assertEqual(self.cache.get(3, state), self.solution)
+        # The movements left after the first one solve the next state
+        space = StateSpace.for_length(3)
+        next_state = space.move(
+            state, StateSpace.DIRECTIONS.index(self.solution[0]))
+        self.assertEqual(self.cache.get(3, next_state), self.solution[1:])
+        # The transposed board, with the pieces in (y, x) and the values
+        # of (y, x), has the transposed solution
+        mirror = [(x % 3) * 3 + x // 3 for x in range(9)]
+        pieces = space.decode(state)
+        transposed = [mirror[pieces[mirror[x]]] for x in range(9)]
+        movements = self.cache.get(3, space.encode(transposed))
+        board = Board(3)
+        board.load_state(space.encode(transposed))
+        self.assertEqual(final_state(board, movements), space.goal)
+        self.assertEqual(len(movements), len(self.solution))
+
+    def test_shorter_solution_wins(self):
+        """ A stored solution is only replaced by a shorter one. """
+        state = self.board.to_state()
+        self.cache.put(3, state, self.longer_solution())
+        self.cache.put(3, state, self.solution)
+        self.assertEqual(self.cache.get(3, state), self.solution)
+        self.cache.put(3, state, self.longer_solution())
+        self.assertEqual(self.cache.get(3, state), self.solution)
+
+    def test_only_optimal_solutions(self):
+        """ solve only stores the solutions known to be optimal. """
+        state = self.board.to_state()
+        movements = self.cache.solve(
+            self.board, lambda tree: self.longer_solution())
+        self.assertEqual(movements, self.longer_solution())
+        self.assertIsNone(self.cache.get(3, state))
+        self.cache.solve(
+            self.board, lambda tree: tree.A_star(tree.linear_conflict),
+            optimal=True)
+        self.assertEqual(len(self.cache.get(3, state)), len(self.solution))
+
+
+class SolverServiceTest(unittest.TestCase):
+    """ Solves boards through a SolverService. """
+    def test_coalescing(self):
+        """ Requests of the same board share a search, and a queue smaller
+        than the requests only delays them.
+        """
+        boards = random_boards(3, 3, seed=5)
+        service = SolverService(workers=1, queue_size=1)
+
+        async def requests():
+            started = asyncio.get_running_loop().create_future()
+            server = asyncio.ensure_future(service.serve(
+                port=0, ready=lambda sockets: started.set_result(None)))
+            await started
+            try:
+                return await asyncio.gather(*[
+                    service.solve(board, identifier=index)
+                    for index, board in enumerate(boards + boards)
+                ])
+            finally:
+                server.cancel()
+                await asyncio.gather(server, return_exceptions=True)
+
+        results = asyncio.run(requests())
+        self.assertEqual(service.coalesced, len(boards))
+        table = DistanceTable.for_length(3)
+        for index, result in enumerate(results):
+            board = boards[index % len(boards)]
+            self.assertEqual(result['id'], index)
+            self.assertEqual(
+                len(result['solution']), table.distance(board.to_state()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+from collections import OrderedDict
+
+
+class TranspositionTable:
+    """ Class that stores the visited board states and their best known cost.
+
+    The table is used by the search strategies to detect boards that were
+    already reached through a different order of movements. A state is only
+    worth visiting again when it is reached with a lower cost (depth) than
+    the best known one.
+
+    When max_size is defined, the table keeps at most max_size states and
+    evicts the least recently used state when it is full, so depth-first
+    strategies can use it with bounded memory. Evicting a state never makes
+    a search wrong, it only allows a duplicate to be expanded again.
+    """
+    def __init__(self, max_size=None):
+        """ Build an empty transposition table.
+
+        Keyword arguments:
+        max_size -- maximum number of stored states, None for unbounded
+        """
+        self.max_size = max_size
+        # Number of states reached again without a better cost
+        self.hits = 0
+        # Number of new states or states reached with a better cost
+        self.misses = 0
+        # Number of states removed because the table was full
+        self.evictions = 0
+        # Best known cost of each state, in least recently used order
+        self.__costs = OrderedDict() if max_size else {}
+
+    def __len__(self):
+        return len(self.__costs)
+
+    def __contains__(self, state):
+        return state in self.__costs
+
+    def cost(self, state):
+        """ Returns the best known cost of a state, or None if unknown.
+
+        Keyword arguments:
+        state -- board state
+        """
+        return self.__costs.get(state)
+
+    def visit(self, state, cost):
+        """ Records a state reached with a cost.
+
+        Returns True when the state is new or the cost is lower than the
+        best known cost, in that case the state needs to be visited.
+        Otherwise returns False and the state can be pruned.
+
+        Keyword arguments:
+        state -- board state
+        cost -- cost to reach the state, like the node depth
+        """
+        known_cost = self.__costs.get(state)
+        if known_cost is not None and known_cost <= cost:
+            self.hits += 1
+            if self.max_size:
+                self.__costs.move_to_end(state)
+            return False
+
+        self.misses += 1
+        self.__costs[state] = cost
+        if self.max_size:
+            self.__costs.move_to_end(state)
+            # Evict the least recently used state when the table is full
+            if len(self.__costs) > self.max_size:
+                self.__costs.popitem(last=False)
+                self.evictions += 1
+        return True
+
+    def items(self):
+        """ Returns an iterator of the (state, best known cost) pairs. """
+        return iter(self.__costs.items())
+
+    def clear(self):
+        """ Removes every state and resets the counters. """
+        self.__costs.clear()
+        self.hits = self.misses = self.evictions = 0
@@ -1,189 +1,321 @@
 from node import Node
-from board import Board
-import copy
+from state import StateSpace
+from transposition import TranspositionTable
+from open_list import OpenList
+from pattern_database import PatternDatabase
+from distance_table import DistanceTable
+from heuristics import MisplacedPieces, AbsoluteDifferences, ManhattanDistance
+from heuristics import LinearConflict, WalkingDistance
+from instrumentation import SearchStats, instrumented
+from checkpoint import Checkpoint
+import heapq
+import itertools
+import sys
+import time
 
 
 class Tree:
     def __init__(self, board):
-        self.__head = Node()
-        self.__depth = 0
+        # Compact states and movement tables for the board length
+        self.__space = StateSpace.for_length(board.length)
+        self.__head = Node(state=board.to_state())
+        # Depth limit of DFS and IDS, IDS increases it
         self.__max_depth = 20
-        self.__initial_board = board
         self.size = 0
         self.MAX_SIZE = 100000
+        # Maximum number of visited states kept by depth-first strategies
+        self.MAX_VISITED_SIZE = 50000
+        # Estimated bytes used by the bookkeeping of each SMA* node
+        self.SMA_ENTRY_BYTES = 400
+        # Maximum estimated bytes used by the SMA* nodes in the last search
+        self.peak_memory = 0
+        # Time (time.monotonic) when the search must stop, None for no limit
+        self.deadline = None
+        # Method that returns True when the search must stop, like when its
+        # client has gone, None to only stop at the deadline
+        self.stop = None
+        # If the last search was stopped by the deadline or by stop
+        self.timed_out = False
+        # Solutions found by the last anytime search, in order, like:
+        # {'movements': [...], 'length': 20, 'bound': 1.5, 'time': 0.1}
+        self.solutions = []
+        # Maximum ratio between the length of the last anytime solution and
+        # the optimal length, None if it is not known
+        self.suboptimality = None
+        # Visited states of the last search, with its hit and miss counts
+        self.visited = TranspositionTable()
+        # Measures of the last search, see SearchStats for the opt-in ones
+        self.stats = SearchStats()
+        # File where the BFS and A* searches save a Checkpoint every
+        # checkpoint_interval seconds and when they stop before finding
+        # the goal, None for no checkpoints. See resume
+        self.checkpoint_path = None
+        self.checkpoint_interval = 60.0
+        # Heuristic methods, called with a board state. The A* strategies
+        # calculate the child values from the parent values with update.
+        # They do not change, so every tree of a length shares them
+        length = board.length
+        self.heuristic_a = MisplacedPieces.for_length(length)
+        self.heuristic_b = AbsoluteDifferences.for_length(length)
+        self.manhattan_distance = ManhattanDistance.for_length(length)
+        # Admissible heuristics, stronger than the manhattan distance
+        self.linear_conflict = LinearConflict.for_length(length)
+        # Walking distance, built on first use by the walking_distance
+        # property because its tables are expensive
+        self.__walking_distance = None
+        # If the goal can be achieved, the strategies return None if not
+        self.solvable = self.__space.is_solvable(self.__head.state)
+        # Admissible lower bound of the solution length, the manhattan
+        # distance without the empty piece
+        self.lower_bound = self.linear_conflict.manhattan(self.__head.state)
 
-    def __inverse(self, first_command, second_command):
-        """ Checks if the first_command is inverse of second_command.
+    @property
+    def walking_distance(self):
+        """ Returns the walking distance heuristic, building its tables the
+        first time. Boards longer than WalkingDistance.MAX_LENGTH raise a
+        ValueError.
+        """
+        if self.__walking_distance is None:
+            self.__walking_distance = WalkingDistance.for_length(
+                self.__space.length)
+        return self.__walking_distance
+
+    def __expired(self):
+        """ Checks if the search deadline was exceeded or if the search was
+        stopped.
+        """
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            self.timed_out = True
+        elif self.stop is not None and self.stop():
+            self.timed_out = True
+        return self.timed_out
+
+    def __is_inverse(self, node, direction):
+        """ Checks if the direction is the inverse of last direction in node
 
         Keyword arguments:
-        first_command -- direction for movement like: UP, DOWN, RIGHT or LEFT
-        second_command -- direction for movement like: UP, DOWN, RIGHT or LEFT
+        node -- tree node
+        direction -- movement index in StateSpace.DIRECTIONS
         """
-        if first_command == 'LEFT' and second_command == 'RIGHT':
-            return True
-        if first_command == 'RIGHT' and second_command == 'LEFT':
-            return True
-        if first_command == 'UP' and second_command == 'DOWN':
-            return True
-        if first_command == 'DOWN' and second_command == 'UP':
-            return True
-        return False
+        return (node.direction is not None
+                and StateSpace.INVERSE[node.direction] == direction)
 
-    def __is_inverse(self, node, command):
-        """ Checks if the command is the inverse of last command in node
+    def __is_new(self, node, direction, state):
+        """ Checks if the child of node reached by direction must be visited.
+
+        The child is pruned when the direction undoes the last node movement
+        or when its state was already visited with a lower or equal depth.
 
         Keyword arguments:
         node -- tree node
-        command -- direction for movement like: UP, DOWN, RIGHT or LEFT
+        direction -- movement index in StateSpace.DIRECTIONS
+        state -- board state reached by the movement
         """
-        # Gets node commands
-        commands = node.value
-        # Checks if the command is inverse of last node command
-        return (len(commands) > 0 and self.__inverse(commands[-1], command))
+        if (self.__is_inverse(node, direction)
+                or not self.visited.visit(state, node.depth + 1)):
+            self.stats.duplicates += 1
+            return False
+        return True
+
+    def __incremental(self, heuristic):
+        """ Returns a method that calculates the heuristic value of a child
+        state from the value of its parent state.
+
+        Heuristics with an update method are updated in O(1), the others
+        are evaluated again for the child state. The evaluations are
+        counted in the tree stats.
 
-    def insert_node(self, node, value):
+        Keyword arguments:
+        heuristic -- heuristic method to calculate the a* estimative
+        """
+        if hasattr(heuristic, 'update'):
+            return self.stats.update(heuristic.update)
+        return self.stats.update(
+            lambda value, state, child_state: heuristic(child_state))
+
+    def insert_node(self, node, direction, state):
         """ Inserts node in the tree.
 
+        The new node only references its parent, nodes do not keep their
+        children.
+
         Keyword arguments:
         node -- parent node to insert new child
-        value -- value of new node
+        direction -- movement index in StateSpace.DIRECTIONS of new node
+        state -- board state reached by the new node movements
         """
-        new_value = list(node.value)
-        new_value.append(value)
-        # The new node value will be the parent value appended the value
-        child = Node(new_value, node.depth)
-        node.add_child(child)
+        child = Node(node, direction, state)
         # Increments the count of tree nodes
         self.size += 1
+        self.stats.generations += 1
         return child
 
-    def remove_node(self, node, value):
-        """ Removes node in the tree.
-
-        Keyword arguments:
-        node -- parent node to remove child
-        value -- value of new node
-        """
-        node.remove_child(value)
-
+    @instrumented
     def BFS(self):
         """ Execute the BFS (Breath-First Search) search tree algorithm
         in order to return the movement list to solve n-puzzle game.
         """
+        # Returns None without searching if the board can not be solved
+        if not self.solvable:
+            return None
         # List that store the nodes that need to be visited
         to_visit_nodes = [self.__head]
+        # States already visited and the depth they were reached with
+        self.visited = TranspositionTable()
+        self.visited.visit(self.__head.state, self.__head.depth)
+        return self.__breadth_first(to_visit_nodes)
+
+    def __breadth_first(self, to_visit_nodes):
+        """ Expands the BFS nodes until the goal is found and returns its
+        movement list, or [] if the search stops before.
+
+        Keyword arguments:
+        to_visit_nodes -- list of nodes to visit, the last one first
+        """
         # Node that solves the problem
         node = self.__head
+        # Frontier operations, timed by the tree stats
+        pop = self.stats.queue(to_visit_nodes.pop)
+        insert = self.stats.queue(to_visit_nodes.insert)
+        # Saves the search state, the next node to visit first
+        checkpoint = self.__checkpointer(
+            'BFS', None, lambda: to_visit_nodes[::-1])
 
         # Search in tree by node that solves the problem while there are nodes
         # to visit or the tree size is greater than maximum defined
-        while len(to_visit_nodes) > 0 and self.size < self.MAX_SIZE:
+        # or the search deadline is exceeded
+        while (len(to_visit_nodes) > 0 and self.size < self.MAX_SIZE
+               and not self.__expired()):
+            checkpoint()
             # Get the last node in the to_visit_nodes array
-            current_node = to_visit_nodes.pop()
-            # Make copy of initial board
-            board = copy.deepcopy(self.__initial_board)
-
-            # Execute node movement in initial board
-            for movement in current_node.value:
-                board.move(movement)
+            current_node = pop()
+            # The node carries the state reached by its movements
+            state = current_node.state
+            self.stats.expand(len(to_visit_nodes))
+            self.stats.bound(current_node.depth)
 
             # Returs if the node commands achieves the goal
-            if board.is_goal_achieved():
+            if state == self.__space.goal:
                 node = current_node
-                self.__initial_board = copy.deepcopy(board)
                 break
 
             # If the node commands doesn't achieve the goal
             # add node available movements as it childrens
             # and add it to the begin of to_visit_nodes
-            for movement in board.available_movements():
-                if not self.__is_inverse(current_node, movement):
-                    new_node = self.insert_node(current_node, movement)
-                    to_visit_nodes.insert(0, new_node)
+            for direction, child_state in self.__space.successors(state):
+                if self.__is_new(current_node, direction, child_state):
+                    new_node = self.insert_node(
+                        current_node, direction, child_state)
+                    insert(0, new_node)
 
+        # Keeps the search state when it stops before finding the goal
+        if node.state != self.__space.goal:
+            checkpoint(True)
         return node.value
 
+    @instrumented
     def DFS(self):
         """ Execute the DFS (Depth-First Search) search tree algorithm
         in order to return the movement list to solve n-puzzle game.
         """
+        # Returns None without searching if the board can not be solved
+        if not self.solvable:
+            return None
         # List that store the nodes that need to be visited
         to_visit_nodes = [self.__head]
         # Node that solves the problem
         current_node = node = self.__head
+        # States already visited, bounded in order to keep the low memory
+        # usage of depth-first search
+        self.visited = TranspositionTable(self.MAX_VISITED_SIZE)
+        self.visited.visit(self.__head.state, self.__head.depth)
+        # Frontier operations, timed by the tree stats
+        pop = self.stats.queue(to_visit_nodes.pop)
+        insert = self.stats.queue(to_visit_nodes.insert)
 
         # Search in tree by node that solves the problem while there are nodes
         # to visit or the tree size is greater than maximum defined
-        while len(to_visit_nodes) > 0 and self.size < self.MAX_SIZE:
+        # or the search deadline is exceeded
+        while (len(to_visit_nodes) > 0 and self.size < self.MAX_SIZE
+               and not self.__expired()):
             # Get the first node in the to_visit_nodes array
-            current_node = to_visit_nodes.pop(0)
-            # Make copy of initial board
-            board = copy.deepcopy(self.__initial_board)
-
-            # Execute node movement in initial board
-            for movement in current_node.value:
-                board.move(movement)
+            current_node = pop(0)
+            # The node carries the state reached by its movements
+            state = current_node.state
+            self.stats.expand(len(to_visit_nodes))
 
             # Execute node movement in initial board
-            if board.is_goal_achieved():
+            if state == self.__space.goal:
                 node = current_node
-                self.__initial_board = copy.deepcopy(board)
                 break
 
             # If the node commands doesn't achieve the goal
             # add node available movements as it childrens
             # and add it to the begin of to_visit_nodes
             if current_node.depth < self.__max_depth:
-                for movement in board.available_movements():
-                    if not self.__is_inverse(current_node, movement):
-                        new_node = self.insert_node(current_node, movement)
-                        to_visit_nodes.insert(0, new_node)
+                for direction, child_state in self.__space.successors(state):
+                    if self.__is_new(current_node, direction, child_state):
+                        new_node = self.insert_node(
+                            current_node, direction, child_state)
+                        insert(0, new_node)
 
         return node.value
 
+    @instrumented
     def IDS(self):
         """ Execute the IDS (Iterative Depth Search) search tree algorithm
         in order to return the movement list to solve n-puzzle game.
         """
+        # Returns None without searching if the board can not be solved
+        if not self.solvable:
+            return None
         # List that store the nodes that need to be visited
         to_visit_nodes = [self.__head]
         # Node that solves the problem
         current_node = node = self.__head
+        # States already visited, bounded in order to keep the low memory
+        # usage of depth-first search
+        self.visited = TranspositionTable(self.MAX_VISITED_SIZE)
+        self.visited.visit(self.__head.state, self.__head.depth)
+        # Frontier operations, timed by the tree stats
+        pop = self.stats.queue(to_visit_nodes.pop)
+        insert = self.stats.queue(to_visit_nodes.insert)
 
         # Search in tree by node that solves the problem while there are nodes
         # to visit or the tree size is greater than maximum defined
-        while len(to_visit_nodes) > 0 and self.size < self.MAX_SIZE:
+        # or the search deadline is exceeded
+        while (len(to_visit_nodes) > 0 and self.size < self.MAX_SIZE
+               and not self.__expired()):
             # Get the first node in the to_visit_nodes array
-            current_node = to_visit_nodes.pop(0)
-            # Make copy of initial board
-            board = copy.deepcopy(self.__initial_board)
-
-            # Execute node movement in initial board
-            for movement in current_node.value:
-                board.move(movement)
+            current_node = pop(0)
+            # The node carries the state reached by its movements
+            state = current_node.state
+            self.stats.expand(len(to_visit_nodes))
 
             # Returs if the node commands achieves the goal
-            if board.is_goal_achieved():
+            if state == self.__space.goal:
                 node = current_node
-                self.__initial_board = copy.deepcopy(board)
                 break
 
             # If the node commands doesn't achieve the goal
             # add node available movements as it childrens
             # and add it to the begin of to_visit_nodes
             if current_node.depth < self.__max_depth:
-                for movement in board.available_movements():
-                    if not self.__is_inverse(current_node, movement):
-                        new_node = self.insert_node(current_node, movement)
-                        to_visit_nodes.insert(0, new_node)
+                for direction, child_state in self.__space.successors(state):
+                    if self.__is_new(current_node, direction, child_state):
+                        new_node = self.insert_node(
+                            current_node, direction, child_state)
+                        insert(0, new_node)
             # If the max_depth is achieved, increment it value in order to
             # to keep searching for the solution
             else:
                 if len(to_visit_nodes) == 1:
                     self.__max_depth += 5
+                    self.stats.bound(self.__max_depth)
 
         return node.value
 
+    @instrumented
     def A_star(self, heuristic):
         """ Execute the A* search tree algorithm in order to return 
         the movement list to solve n-puzzle game.
@@ -191,77 +323,824 @@ class Tree:
         Keyword arguments:
         heuristic -- heuristic method to calculate the a* estimative
         """
-        # A list that store a object with the nodes and its heuristic weight
-        to_visit_nodes = [
-            {'weight': self.__head.depth, 'node': self.__head}
-        ]
+        # Returns None without searching if the board can not be solved
+        if not self.solvable:
+            return None
+        # States already visited and the depth they were reached with
+        self.visited = TranspositionTable()
+        self.visited.visit(self.__head.state, self.__head.depth)
+        # Priority queue of nodes ordered by its heuristic weight
+        to_visit_nodes = OpenList(self.visited.cost)
+        self.__head.heuristic = self.stats.evaluate(
+            heuristic, self.__head.state)
+        to_visit_nodes.push(self.__head, self.__head.heuristic)
+        return self.__best_first(to_visit_nodes, heuristic)
+
+    def __best_first(self, to_visit_nodes, heuristic):
+        """ Expands the A* nodes until the goal is found and returns its
+        movement list, or [] if the search stops before.
+
+        Keyword arguments:
+        to_visit_nodes -- OpenList of nodes to visit
+        heuristic -- heuristic method to calculate the a* estimative
+        """
+        # Frontier operations, timed by the tree stats
+        push = self.stats.queue(to_visit_nodes.push)
+        pop = self.stats.queue(to_visit_nodes.pop)
+        # Method that calculates the child heuristic values
+        update = self.__incremental(heuristic)
         # Node that solves the problem
         node = self.__head
+        # Saves the search state, in the order the nodes would be visited
+        checkpoint = self.__checkpointer(
+            'A_star', heuristic, to_visit_nodes.nodes)
 
         # Search in tree by node that solves the problem while there are nodes
         # to visit or the tree size is greater than maximum defined
-        while len(to_visit_nodes) > 0 and self.size < self.MAX_SIZE:
-            # Get the first node in the to_visit_nodes array
-            current_node = to_visit_nodes.pop(0)['node']
-            # Make copy of initial board
-            board = copy.deepcopy(self.__initial_board)
-
-            # Execute node movement in initial board
-            for movement in current_node.value:
-                board.move(movement)
+        # or the search deadline is exceeded
+        while (len(to_visit_nodes) > 0 and self.size < self.MAX_SIZE
+               and not self.__expired()):
+            checkpoint()
+            # Get the node with minimum weight in the to_visit_nodes
+            current_node = pop()
+            # The node carries the state reached by its movements
+            state = current_node.state
+            self.stats.expand(len(to_visit_nodes))
+            self.stats.bound(current_node.depth + current_node.heuristic)
 
             # Returs if the node commands achieves the goal
-            if board.is_goal_achieved():
+            if state == self.__space.goal:
                 node = current_node
-                self.__initial_board = copy.deepcopy(board)
                 break
 
             # If the node commands doesn't achieve the goal
             # add node available movements as it childrens
-            # and add it to the begin of to_visit_nodes
-            for movement in board.available_movements():
-                if not self.__is_inverse(current_node, movement):
-                    new_node = self.insert_node(current_node, movement)
-                    heuristic_value = heuristic(board) + new_node.depth
-                    # Add object with node and it weight to to_visit_nodes list
-                    to_visit_nodes.insert(
-                        0, {'weight': heuristic_value, 'node': new_node}
-                    )
-                    # Sort to_visit_nodes list to keep the minimum weight 
-                    # as the first position list
-                    to_visit_nodes.sort(key=lambda x: x['weight'])
+            # and add it to to_visit_nodes with its weight
+            for direction, child_state in self.__space.successors(state):
+                if self.__is_new(current_node, direction, child_state):
+                    new_node = self.insert_node(
+                        current_node, direction, child_state)
+                    new_node.heuristic = update(
+                        current_node.heuristic, state, child_state)
+                    push(new_node, new_node.heuristic)
+
+        # Keeps the search state when it stops before finding the goal
+        if node.state != self.__space.goal:
+            checkpoint(True)
+        return node.value
+
+    def __checkpointer(self, strategy, heuristic, frontier):
+        """ Returns a method that saves a checkpoint of the search if
+        checkpoint_interval seconds have passed since the last one, or
+        always if it is called with True. The method does nothing when
+        checkpoint_path is None.
+
+        Keyword arguments:
+        strategy -- name of the strategy method, like: A_star
+        heuristic -- heuristic method of the search, None for BFS
+        frontier -- method that returns the frontier nodes in the order
+                    they would be visited
+        """
+        if self.checkpoint_path is None:
+            return lambda final=False: None
+        name = '' if heuristic is None else self.__heuristic_name(heuristic)
+        next_time = time.monotonic() + self.checkpoint_interval
+
+        def save(final=False):
+            nonlocal next_time
+            if final or time.monotonic() >= next_time:
+                self.__save_checkpoint(strategy, name, frontier())
+                next_time = time.monotonic() + self.checkpoint_interval
+        return save
+
+    def __heuristic_name(self, heuristic):
+        """ Returns the name of the tree attribute or method of a heuristic,
+        that is how a checkpoint finds it again.
+
+        Keyword arguments:
+        heuristic -- heuristic method of the search
+        """
+        for name, value in vars(self).items():
+            if value is heuristic:
+                # Heuristics built on first use are kept in a private
+                # attribute with the name of their property
+                return name.replace('_Tree__', '', 1)
+        if getattr(heuristic, '__self__', None) is self:
+            return heuristic.__name__
+        raise ValueError(
+            'Checkpoints need a heuristic that is a tree attribute')
+
+    def __save_checkpoint(self, strategy, heuristic, frontier):
+        """ Saves the search state in checkpoint_path: the frontier nodes and
+        their ancestors, the visited states, the bound and the counters.
+
+        Keyword arguments:
+        strategy -- name of the strategy method, like: A_star
+        heuristic -- name of the heuristic attribute, empty for BFS
+        frontier -- frontier nodes in the order they would be visited
+        """
+        # Index of each saved node, the parents are saved first
+        indexes = {}
+        nodes = []
+        for frontier_node in frontier:
+            # Ancestors that were not saved yet, from the node up
+            chain = []
+            node = frontier_node
+            while node is not None and id(node) not in indexes:
+                chain.append(node)
+                node = node.parent
+            for node in reversed(chain):
+                indexes[id(node)] = len(nodes)
+                nodes.append((
+                    node.state,
+                    None if node.parent is None else indexes[id(node.parent)],
+                    node.direction))
+        Checkpoint(
+            self.__space.length, strategy, heuristic,
+            self.stats.bounds[-1] if self.stats.bounds else 0, self.size,
+            {name: getattr(self.stats, name) for name in Checkpoint.COUNTERS},
+            nodes,
+            [(indexes[id(node)], node.heuristic) for node in frontier],
+            list(self.visited.items())
+        ).save(self.checkpoint_path)
+
+    @instrumented
+    def resume(self, checkpoint, heuristic=None):
+        """ Continues a BFS or A* search from a checkpoint, like it had
+        never stopped, and returns the movement list to solve n-puzzle
+        game. The tree size keeps counting from the checkpoint size, so
+        MAX_SIZE may need to be increased.
+
+        Keyword arguments:
+        checkpoint -- Checkpoint of a search of this tree board, like:
+                      Checkpoint.load(path)
+        heuristic -- heuristic method of an A* search, the checkpoint one
+                     by default
+        """
+        if (checkpoint.length != self.__space.length
+                or not checkpoint.nodes
+                or checkpoint.nodes[0][0] != self.__head.state):
+            raise ValueError('The checkpoint is not a search of this board')
+        if checkpoint.strategy not in ('BFS', 'A_star'):
+            raise ValueError(
+                'Unknown strategy: {}'.format(checkpoint.strategy))
+        # Rebuilds the saved nodes, the first one is the tree head
+        nodes = [self.__head]
+        for state, parent, direction in checkpoint.nodes[1:]:
+            nodes.append(Node(nodes[parent], direction, state))
+        self.visited = TranspositionTable()
+        for state, cost in checkpoint.closed:
+            self.visited.visit(state, cost)
+        self.size = checkpoint.size
+        for name, value in checkpoint.counters.items():
+            setattr(self.stats, name, value)
+        self.stats.bounds = [checkpoint.bound]
+
+        if checkpoint.strategy == 'BFS':
+            return self.__breadth_first(
+                [nodes[index] for index, _ in reversed(checkpoint.frontier)])
+        if heuristic is None:
+            heuristic = getattr(self, checkpoint.heuristic)
+        to_visit_nodes = OpenList(self.visited.cost)
+        for index, heuristic_value in checkpoint.frontier:
+            nodes[index].heuristic = heuristic_value
+            to_visit_nodes.push(nodes[index], heuristic_value)
+        return self.__best_first(to_visit_nodes, heuristic)
+
+    @instrumented
+    def anytime_A_star(self, heuristic, budget=None, weight=3.0,
+                       weight_step=0.5, improved=None):
+        """ Execute an anytime A* search, in the style of ARA* (Anytime
+        Repairing A*), in order to return the best movement list found to
+        solve n-puzzle game until the deadline.
+
+        A weighted A* search with a high weight finds a first solution
+        quickly, then the weight is decreased and the search continues
+        from its open nodes, only expanding again the nodes whose depth
+        was improved, so each iteration finds a solution at least as short
+        as the previous one. After each iteration the suboptimality bound
+        is solution length / minimum open weight, or its minimum with the
+        weight if the iteration was complete, and the search stops when it
+        reaches 1 (the solution is optimal), at the deadline or at
+        MAX_SIZE. The bound only holds for admissible heuristics, like
+        linear_conflict.
+
+        The solutions found are kept in solutions, and timed_out is only
+        set if the deadline is exceeded before the first solution.
+
+        Keyword arguments:
+        heuristic -- heuristic method to calculate the a* estimative
+        budget -- seconds to search, None to keep the tree deadline
+        weight -- heuristic weight of the first iteration
+        weight_step -- weight decrease of each iteration
+        improved -- method called with (movements, bound) for each better
+                    solution found, or None
+        """
+        # Returns None without searching if the board can not be solved
+        if not self.solvable:
+            return None
+        if budget is not None:
+            self.deadline = time.monotonic() + budget
+        start = time.monotonic()
+        self.solutions = []
+        self.suboptimality = None
+        if self.__head.state == self.__space.goal:
+            self.suboptimality = 1
+            return self.__head.value
+        # States already visited and the best depth they were reached with
+        self.visited = TranspositionTable()
+        self.visited.visit(self.__head.state, self.__head.depth)
+        self.__head.heuristic = self.stats.evaluate(
+            heuristic, self.__head.state)
+        # Method that calculates the child heuristic values
+        update = self.__incremental(heuristic)
+        to_visit_nodes = OpenList(self.visited.cost, weight)
+        to_visit_nodes.push(self.__head, self.__head.heuristic)
+        # Nodes improved after being expanded in the current iteration
+        inconsistent = {}
+        # Goal node of the best solution found
+        best = None
+
+        while True:
+            best, complete = self.__improve_path(
+                to_visit_nodes, inconsistent, best, update)
+            # Open nodes of the next iteration, the lowest weight among
+            # them is a lower bound of the optimal solution length
+            open_nodes = {}
+            for node in to_visit_nodes.drain() + list(inconsistent.values()):
+                open_nodes[node.state] = node
+            minimum = min(
+                (node.depth + node.heuristic for node in open_nodes.values()),
+                default=float('inf'))
+            if best is not None:
+                bound = 1
+                if best.depth > minimum:
+                    bound = best.depth / minimum
+                    # The weight only bounds the solution of an iteration
+                    # that was not stopped by the deadline or MAX_SIZE
+                    if complete:
+                        bound = min(weight, bound)
+                # Reports a shorter solution or a lower bound
+                if (not self.solutions
+                        or best.depth < self.solutions[-1]['length']
+                        or bound < self.suboptimality):
+                    self.suboptimality = bound
+                    movements = best.value
+                    self.solutions.append({
+                        'movements': movements,
+                        'length': len(movements),
+                        'bound': bound,
+                        'time': time.monotonic() - start,
+                    })
+                    if improved is not None:
+                        improved(movements, bound)
+            if (weight <= 1 or (best is not None and self.suboptimality <= 1)
+                    or self.size >= self.MAX_SIZE or self.__expired()):
+                break
+
+            # Next iteration with a lower weight and every open node
+            weight = max(1, weight - weight_step)
+            to_visit_nodes = OpenList(self.visited.cost, weight)
+            for node in open_nodes.values():
+                to_visit_nodes.push(node, node.heuristic)
+            inconsistent = {}
+
+        if best is None:
+            return self.__head.value
+        # The deadline only stopped the search if there is no solution
+        self.timed_out = False
+        return best.value
+
+    def __improve_path(self, to_visit_nodes, inconsistent, best, update):
+        """ Expands the nodes of an anytime A* iteration while their
+        weight is lower than the best solution length.
+
+        Returns a tuple with the goal node of the best solution found, or
+        best, and whether the iteration was complete: no open node could
+        improve the solution, so it was not stopped by the deadline or by
+        MAX_SIZE.
+
+        Keyword arguments:
+        to_visit_nodes -- weighted open list of the iteration
+        inconsistent -- nodes improved after their state was expanded in
+                        this iteration, by state
+        best -- goal node of the best solution found, or None
+        update -- method that calculates the child heuristic values
+        """
+        # States expanded in this iteration
+        closed = set()
+        while (len(to_visit_nodes) > 0 and self.size < self.MAX_SIZE
+               and not self.__expired()):
+            # Stops if no open node can improve the solution
+            if best is not None and to_visit_nodes.peek_weight() >= best.depth:
+                return best, True
+            current_node = to_visit_nodes.pop()
+            state = current_node.state
+            closed.add(state)
+            self.stats.expand(len(to_visit_nodes))
+
+            for direction, child_state in self.__space.successors(state):
+                if self.__is_new(current_node, direction, child_state):
+                    new_node = self.insert_node(
+                        current_node, direction, child_state)
+                    new_node.heuristic = update(
+                        current_node.heuristic, state, child_state)
+                    if child_state == self.__space.goal:
+                        best = new_node
+                    # Expanded states are only expanded again in the next
+                    # iteration
+                    if child_state in closed:
+                        inconsistent[child_state] = new_node
+                    else:
+                        to_visit_nodes.push(new_node, new_node.heuristic)
+        return best, len(to_visit_nodes) == 0
+
+    @instrumented
+    def IDA_star(self, heuristic):
+        """ Execute the IDA* (Iterative Deepening A*) search tree algorithm
+        in order to return the movement list to solve n-puzzle game.
+
+        A depth-first search is repeated with a growing bound of the weight
+        (depth + heuristic). Only the movements of the current path are
+        stored, so the memory usage grows with the solution depth and no
+        tree node is created. The MAX_SIZE limit is not applied, only the
+        deadline.
+
+        Keyword arguments:
+        heuristic -- heuristic method to calculate the a* estimative
+        """
+        # Returns None without searching if the board can not be solved
+        if not self.solvable:
+            return None
+        state = self.__head.state
+        # Directions of the movements from the initial state to the current
+        path = []
+        # The first bound is the weight of the initial state
+        value = bound = self.stats.evaluate(heuristic, state)
+        # Method that calculates the child heuristic values
+        update = self.__incremental(heuristic)
+
+        while True:
+            self.stats.bound(bound)
+            result = self.__bounded_search(
+                state, 0, bound, path, update, value)
+            # Returns the path movements if the goal is achieved
+            if result is True:
+                return [StateSpace.DIRECTIONS[x] for x in path]
+            # Returns the head value if there are no states to search
+            if result == float('inf'):
+                return self.__head.value
+            # The next bound is the minimum weight that exceeded the bound
+            bound = result
+
+    def __bounded_search(self, state, depth, bound, path, update, value):
+        """ Search the goal from state without exceeding the weight bound.
+
+        Returns True if the goal is achieved, with its movements in path,
+        otherwise returns the minimum weight that exceeded the bound.
+
+        Keyword arguments:
+        state -- board state of the current path end
+        depth -- number of movements in the current path
+        bound -- maximum weight (depth + heuristic) to be searched
+        path -- directions of the movements of the current path
+        update -- method that calculates the child heuristic values
+        value -- heuristic value of state
+        """
+        weight = depth + value
+        if weight > bound:
+            return weight
+        # Stops the search without other bounds if the deadline is exceeded
+        if self.__expired():
+            return float('inf')
+        if state == self.__space.goal:
+            return True
+
+        # The frontier of a depth-first search is the current path
+        self.stats.expand(depth)
+        minimum = float('inf')
+        for direction, child_state in self.__space.successors(state):
+            # Do not undo the last movement of the path
+            if path and StateSpace.INVERSE[path[-1]] == direction:
+                self.stats.duplicates += 1
+                continue
+            self.size += 1
+            self.stats.generations += 1
+            path.append(direction)
+            result = self.__bounded_search(
+                child_state, depth + 1, bound, path, update,
+                update(value, state, child_state))
+            if result is True:
+                return True
+            path.pop()
+            minimum = min(minimum, result)
+        return minimum
+
+    @instrumented
+    def bidirectional_BFS(self):
+        """ Execute a bidirectional BFS (Breath-First Search) in order to
+        return the movement list to solve n-puzzle game.
+
+        One search starts from the initial board and the other one from
+        the goal board. In each iteration, the smaller level is expanded,
+        and the search stops at the end of the level where both searches
+        reached the same state, joining the two paths in that state.
+        """
+        # Returns None without searching if the board can not be solved
+        if not self.solvable:
+            return None
+        if self.__head.state == self.__space.goal:
+            return self.__head.value
+        goal_head = Node(state=self.__space.goal)
+        # Nodes reached by each search, by state
+        forward = {self.__head.state: self.__head}
+        backward = {goal_head.state: goal_head}
+        # Nodes of the last level of each search
+        forward_level = [self.__head]
+        backward_level = [goal_head]
+
+        while (forward_level and backward_level
+               and self.size < self.MAX_SIZE and not self.__expired()):
+            self.stats.bound(forward_level[0].depth + backward_level[0].depth)
+            # Expands the smaller level in order to expand fewer nodes
+            if len(forward_level) <= len(backward_level):
+                forward_level, meeting = self.__expand_level(
+                    forward_level, forward, backward)
+                if meeting:
+                    return self.__join(*meeting)
+            else:
+                backward_level, meeting = self.__expand_level(
+                    backward_level, backward, forward)
+                if meeting:
+                    return self.__join(*reversed(meeting))
+
+        return self.__head.value
+
+    def __expand_level(self, level, reached, other_reached):
+        """ Expands every node of a level of a bidirectional search.
+
+        Returns the list of new nodes and the (node, other search node) pair
+        of the shortest path found between both searches, or None.
+
+        Keyword arguments:
+        level -- nodes to be expanded
+        reached -- nodes reached by this search, by state
+        other_reached -- nodes reached by the other search, by state
+        """
+        new_level = []
+        meeting = None
+        for index, node in enumerate(level):
+            self.stats.expand(len(level) - index - 1 + len(new_level))
+            for direction, child_state in self.__space.successors(node.state):
+                if (self.__is_inverse(node, direction)
+                        or child_state in reached):
+                    self.stats.duplicates += 1
+                    continue
+                child = self.insert_node(node, direction, child_state)
+                reached[child_state] = child
+                new_level.append(child)
+                # Keeps the shortest path between both searches
+                other = other_reached.get(child_state)
+                if other is not None and (
+                        meeting is None
+                        or child.depth + other.depth
+                        < meeting[0].depth + meeting[1].depth):
+                    meeting = (child, other)
+        return new_level, meeting
+
+    @instrumented
+    def bidirectional_A_star(self, heuristic, backward_heuristic=None):
+        """ Execute a bidirectional A* search tree algorithm in order to
+        return the movement list to solve n-puzzle game.
+
+        One A* search goes from the initial board to the goal and the other
+        one from the goal to the initial board, each heuristic estimates the
+        distance to the end of its search (front-to-end). The search with
+        fewer open nodes is expanded, and when both searches reach the same
+        state the path is kept. The search stops when no open node can
+        be part of a shorter path, so the solution is optimal for admissible
+        heuristics.
+
+        Keyword arguments:
+        heuristic -- heuristic method to calculate the a* estimative
+        backward_heuristic -- heuristic method that estimates the distance
+                              to the initial board. By default, heuristic
+                              towards the initial board if it has the
+                              towards method, otherwise zero.
+        """
+        # Returns None without searching if the board can not be solved
+        if not self.solvable:
+            return None
+        if backward_heuristic is None:
+            if hasattr(heuristic, 'towards'):
+                backward_heuristic = heuristic.towards(self.__head.state)
+            else:
+                backward_heuristic = lambda state: 0
+        goal_head = Node(state=self.__space.goal)
+
+        # For each search: nodes reached by state, open list, the method
+        # that calculates the child heuristic values and the open list push
+        # and pop, timed by the tree stats
+        searches = []
+        for head, search_heuristic in ((self.__head, heuristic),
+                                       (goal_head, backward_heuristic)):
+            reached = {head.state: head}
+            to_visit_nodes = OpenList(lambda state, x=reached: x[state].depth)
+            head.heuristic = self.stats.evaluate(search_heuristic, head.state)
+            to_visit_nodes.push(head, head.heuristic)
+            searches.append((reached, to_visit_nodes,
+                             self.__incremental(search_heuristic),
+                             self.stats.queue(to_visit_nodes.push),
+                             self.stats.queue(to_visit_nodes.pop)))
+        forward_open, backward_open = searches[0][1], searches[1][1]
+        # Length of the shortest path found and its (forward, backward) nodes
+        best_length = float('inf')
+        meeting = None
+        if self.__head.state == goal_head.state:
+            return self.__head.value
+
+        while (len(forward_open) > 0 and len(backward_open) > 0
+               and self.size < self.MAX_SIZE and not self.__expired()):
+            # Stops if no open node can be part of a shorter path
+            bound = max(forward_open.peek_weight(),
+                        backward_open.peek_weight())
+            if best_length <= bound:
+                break
+            self.stats.bound(bound)
+            # Expands the search with fewer open nodes
+            side = 0 if len(forward_open) <= len(backward_open) else 1
+            reached, to_visit_nodes, update, push, pop = searches[side]
+            other_reached = searches[1 - side][0]
+            current_node = pop()
+            state = current_node.state
+            self.stats.expand(len(forward_open) + len(backward_open))
+
+            for direction, child_state in self.__space.successors(state):
+                if self.__is_inverse(current_node, direction):
+                    self.stats.duplicates += 1
+                    continue
+                known = reached.get(child_state)
+                if known is not None and known.depth <= current_node.depth + 1:
+                    self.stats.duplicates += 1
+                    continue
+                new_node = self.insert_node(
+                    current_node, direction, child_state)
+                reached[child_state] = new_node
+                new_node.heuristic = update(
+                    current_node.heuristic, state, child_state)
+                push(new_node, new_node.heuristic)
+                # Keeps the shortest path between both searches
+                other = other_reached.get(child_state)
+                if (other is not None
+                        and new_node.depth + other.depth < best_length):
+                    best_length = new_node.depth + other.depth
+                    meeting = (new_node, other)
+                    if side == 1:
+                        meeting = (other, new_node)
+
+        if meeting is None:
+            return self.__head.value
+        return self.__join(*meeting)
+
+    @instrumented
+    def SMA_star(self, heuristic, memory_limit=64 * 1024 * 1024):
+        """ Execute a memory-bounded A* search tree algorithm, in the style
+        of SMA* (Simplified Memory-bounded A*), in order to return the
+        movement list to solve n-puzzle game.
+
+        The estimated bytes of the nodes in memory and of the open list
+        entries are kept under memory_limit. Before the children of a node
+        are added, the worst leaves (highest weight, then lowest depth) are
+        forgotten until they fit, and the weight of each one is backed up
+        in its parent, that goes back to the open nodes with the minimum
+        forgotten weight. When the parent is expanded again, only the
+        forgotten children are created again. The solution is optimal for
+        admissible heuristics if its path fits in the memory limit.
+
+        Keyword arguments:
+        heuristic -- heuristic method to calculate the a* estimative
+        memory_limit -- maximum estimated bytes of the search nodes
+        """
+        # Returns None without searching if the board can not be solved
+        if not self.solvable:
+            return None
+        # For each node in memory: [weight, minimum forgotten weight,
+        # parent, states of the children in memory, estimated bytes]
+        info = {}
+        # Open nodes ordered by the best and by the worst weight. For each
+        # open node, opened has the counter of its current entries and
+        # their number, the other entries are stale
+        best_nodes = []
+        worst_nodes = []
+        opened = {}
+        counter = itertools.count()
+        update = self.__incremental(heuristic)
+        # Estimated bytes of a heap entry, stale entries included
+        entry_bytes = sys.getsizeof((0, 0, 0, None)) + 8
+        # Bytes of the nodes in memory, bytes of the forgotten nodes that
+        # stale entries may still reference and number of live entries
+        memory = 0
+        forgotten = 0
+        live = 0
+
+        def used():
+            return (memory + forgotten
+                    + (len(best_nodes) + len(worst_nodes)) * entry_bytes)
+
+        def open_node(node):
+            nonlocal live
+            if node in opened:
+                live -= opened[node][1]
+            entry = next(counter)
+            weight = info[node][0]
+            heapq.heappush(best_nodes, (weight, -node.depth, entry, node))
+            entries = 1
+            # Only open nodes without children in memory can be forgotten
+            if not info[node][3] and node is not self.__head:
+                heapq.heappush(
+                    worst_nodes, (-weight, node.depth, entry, node))
+                entries = 2
+            opened[node] = (entry, entries)
+            live += entries
+
+        def pop_open(nodes):
+            nonlocal live
+            while nodes:
+                entry, node = heapq.heappop(nodes)[-2:]
+                if node in opened and opened[node][0] == entry:
+                    live -= opened.pop(node)[1]
+                    return node
+            return None
+
+        def compact():
+            """ Removes the stale entries of the heaps, that also frees the
+            forgotten nodes they reference.
+            """
+            nonlocal forgotten
+            for nodes in (best_nodes, worst_nodes):
+                nodes[:] = [x for x in nodes
+                            if x[-1] in opened and opened[x[-1]][0] == x[-2]]
+                heapq.heapify(nodes)
+            forgotten = 0
+
+        def free(needed, keep):
+            """ Forgets the worst leaves until needed more bytes fit in the
+            memory limit, or there is no other leaf to forget.
+
+            Keyword arguments:
+            needed -- bytes to be added
+            keep -- node that is not forgotten, the expanded node
+            """
+            nonlocal memory, forgotten
+            kept = False
+            while used() + needed > memory_limit:
+                stale = len(best_nodes) + len(worst_nodes) - live
+                # Compacting is linear, it is only done when it frees a
+                # good part of the memory
+                if (stale > live or forgotten + stale * entry_bytes
+                        > memory_limit // 4):
+                    compact()
+                    if used() + needed <= memory_limit:
+                        break
+                leaf = pop_open(worst_nodes)
+                if leaf is None:
+                    break
+                # The expanded node is open again by a forgotten child
+                if leaf is keep:
+                    kept = True
+                    continue
+                leaf_weight, _, parent, _, size = info.pop(leaf)
+                memory -= size
+                forgotten += size
+                parent_info = info[parent]
+                parent_info[3].discard(leaf.state)
+                parent_info[1] = min(parent_info[1], leaf_weight)
+                # The parent is open again with the backed up weight
+                if (parent not in opened or parent_info[1] < parent_info[0]
+                        or not parent_info[3]):
+                    parent_info[0] = parent_info[1]
+                    open_node(parent)
+            if kept:
+                open_node(keep)
+
+        # Frontier operations, timed by the tree stats
+        open_node = self.stats.queue(open_node)
+        pop_open = self.stats.queue(pop_open)
+        self.__head.heuristic = self.stats.evaluate(
+            heuristic, self.__head.state)
+        info[self.__head] = [self.__head.heuristic, float('inf'), None,
+                             set(), self.__node_bytes(self.__head)]
+        memory = info[self.__head][4]
+        open_node(self.__head)
+        self.peak_memory = used()
+        # Node that solves the problem
+        node = self.__head
+
+        while (opened and self.size < self.MAX_SIZE
+               and not self.__expired()):
+            if len(best_nodes) + len(worst_nodes) > 2 * live + 64:
+                compact()
+            current_node = pop_open(best_nodes)
+            state = current_node.state
+            current_info = info[current_node]
+            self.stats.expand(len(opened))
+            self.stats.bound(current_info[0])
+
+            # Returs if the node commands achieves the goal
+            if state == self.__space.goal:
+                node = current_node
+                break
+
+            # Creates the children that are not in memory, the weight of a
+            # child is at least the weight of its parent
+            current_info[1] = float('inf')
+            children = current_info[3]
+            new_nodes = []
+            for direction, child_state in self.__space.successors(state):
+                if (self.__is_inverse(current_node, direction)
+                        or child_state in children):
+                    self.stats.duplicates += 1
+                    continue
+                new_node = self.insert_node(
+                    current_node, direction, child_state)
+                new_node.heuristic = update(
+                    current_node.heuristic, state, child_state)
+                new_nodes.append(new_node)
+
+            # Forgets the worst leaves before adding the children, so the
+            # memory limit is only exceeded when the path does not fit
+            free(sum(self.__node_bytes(x) + 2 * entry_bytes
+                     for x in new_nodes), current_node)
+            for new_node in new_nodes:
+                weight = max(current_info[0],
+                             new_node.depth + new_node.heuristic)
+                size = self.__node_bytes(new_node)
+                info[new_node] = [weight, float('inf'), current_node, set(),
+                                  size]
+                children.add(new_node.state)
+                memory += size
+                open_node(new_node)
+            # The node may be open again by a forgotten child, it can not
+            # be forgotten now that it has children in memory
+            if new_nodes and current_node in opened:
+                open_node(current_node)
+            self.peak_memory = max(self.peak_memory, used())
 
         return node.value
 
-    def heuristic_a(self, board):
-        """ Returns the heuristic value according the board.
+    @instrumented
+    def exact(self):
+        """ Returns an optimal movement list to solve n-puzzle game from
+        the exact distance table of the board length, without searching.
+
+        Boards longer than DistanceTable.MAX_LENGTH have no table, so they
+        raise a ValueError.
+        """
+        if self.__space.length > DistanceTable.MAX_LENGTH:
+            raise ValueError(
+                'Exact solutions are only known up to {0}x{0} boards'.format(
+                    DistanceTable.MAX_LENGTH))
+        # Returns None without searching if the board can not be solved
+        if not self.solvable:
+            return None
+        return DistanceTable.for_length(self.__space.length).solve(
+            self.__head.state)
 
-        This heuristic method returns the count of pieces that are in
-        it correct position according to the goal board.
+    def __node_bytes(self, node):
+        """ Returns the estimated bytes used by a SMA* node.
 
         Keyword arguments:
-        board -- two-dimensional array to be base of heristic method
+        node -- tree node
         """
-        return board.difference_to_goal()
+        return (sys.getsizeof(node) + sys.getsizeof(node.state)
+                + self.SMA_ENTRY_BYTES)
 
-    def heuristic_b(self, board):
-        """ Returns the heuristic value according the board.
+    def __join(self, forward_node, backward_node):
+        """ Returns the movement list of a bidirectional search path.
 
-        This heuristic method returns the sum of absolute differences of
-        each board position and the equivalent into the goal board.
+        The backward node movements go from the goal to the meeting state,
+        so they are reversed and inverted to go from the meeting state to
+        the goal.
 
         Keyword arguments:
-        board -- two-dimensional array to be base of heristic method
+        forward_node -- node of the search from the initial board
+        backward_node -- node of the search from the goal with same state
         """
-        return board.sum_of_absolute_differences()
+        movements = forward_node.value
+        node = backward_node
+        while node.parent is not None:
+            movements.append(
+                StateSpace.DIRECTIONS[StateSpace.INVERSE[node.direction]])
+            node = node.parent
+        return movements
 
-    def manhattan_distance(self, board):
-        """ Returns the heuristic value according the board.
+    def pattern_database(self, state):
+        """ Returns the heuristic value according the board state.
 
-        This heuristic method returns the sum of manhattan distance of
-        each board position and it correct position in goal board.
+        This heuristic method returns the sum of the additive disjoint
+        pattern database values, the tables are built in the first use.
 
         Keyword arguments:
-        board -- two-dimensional array to be base of heristic method
+        state -- board state to be base of heristic method
         """
-        return board.manhattan_distance()
+        return PatternDatabase.for_length(self.__space.length)(state)
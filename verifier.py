@@ -0,0 +1,124 @@
+from state import StateSpace
+from instance_generator import movement_targets
+import numpy
+
+
+class BatchVerifier:
+    """ Class that replays many movement lists at once with NumPy.
+
+    The initial boards are a two-dimensional array with a row of piece
+    values for each board, like InstanceGenerator boards, and the movement
+    lists are a two-dimensional array of direction indexes (see encode),
+    padded with -1. Each step applies the movement of every board at once,
+    so the cost is a few array operations per step, not per board. A board
+    stops at its first illegal movement, that moves the empty piece out of
+    the board.
+    """
+    # Direction index used to pad the shorter movement lists
+    PADDING = -1
+
+    def __init__(self, length):
+        """ Build a verifier of boards of a length.
+
+        Keyword arguments:
+        length -- number of columns and rows of the board (ex: 3)
+        """
+        self.space = StateSpace.for_length(length)
+        self.targets = movement_targets(self.space)
+
+    def encode(self, movements):
+        """ Returns the array of direction indexes of many movement lists,
+        padded with PADDING. A None movement list, like the result of a
+        search that found no solution, is a row of PADDING.
+
+        Keyword arguments:
+        movements -- list of movement lists, like: [['UP', 'LEFT'], None]
+        """
+        indexes = {name: index
+                   for index, name in enumerate(StateSpace.DIRECTIONS)}
+        longest = max((len(x) for x in movements if x is not None),
+                      default=0)
+        encoded = numpy.full(
+            (len(movements), longest), self.PADDING, dtype=numpy.int8)
+        for row, movement_list in enumerate(movements):
+            if movement_list is None:
+                continue
+            encoded[row, :len(movement_list)] = [
+                indexes[x] for x in movement_list]
+        return encoded
+
+    def boards(self, states):
+        """ Returns the array of pieces of many board states.
+
+        Keyword arguments:
+        states -- iterable of board states
+        """
+        return numpy.array(
+            [self.space.decode(state) for state in states], dtype=numpy.uint8
+        ).reshape(-1, self.space.size)
+
+    def verify(self, boards, movements):
+        """ Replays the movements of each board and returns a dict of arrays
+        with an item for each board, like:
+            {'valid': [True, False], 'solved': [True, False],
+             'first_illegal': [-1, 3], 'final': [[0, 1, ...], [...]]}
+        where valid is True if every movement is legal and the final board
+        is the goal, solved is True if the final board is the goal,
+        first_illegal is the index of the first illegal movement or -1,
+        and final has the pieces of the board after the legal movements.
+
+        Keyword arguments:
+        boards -- array with the pieces of a board in each row
+        movements -- array of direction indexes of each board, see encode
+        """
+        final = numpy.array(boards, dtype=numpy.uint8, copy=True)
+        movements = numpy.asarray(movements, dtype=numpy.int64)
+        count = len(final)
+        if len(movements) != count:
+            raise ValueError('There must be a movement list for each board')
+        rows = numpy.arange(count)
+        empty = final.argmin(axis=1)
+        first_illegal = numpy.full(count, -1, dtype=numpy.int64)
+        # Boards that have not found an illegal movement yet
+        legal = numpy.ones(count, dtype=bool)
+
+        for step in range(movements.shape[1]):
+            directions = movements[:, step]
+            active = legal & (directions != self.PADDING)
+            # Unknown direction indexes are illegal movements too
+            positions = numpy.where(
+                (directions >= 0) & (directions < 4),
+                self.targets[empty, directions % 4], -1)
+            illegal = active & (positions < 0)
+            first_illegal[illegal] = step
+            legal &= ~illegal
+            active &= ~illegal
+            moved = rows[active]
+            positions = positions[active]
+            final[moved, empty[active]] = final[moved, positions]
+            final[moved, positions] = 0
+            empty[active] = positions
+
+        solved = (final == numpy.arange(self.space.size)).all(axis=1)
+        return {
+            'valid': legal & solved,
+            'solved': solved,
+            'first_illegal': first_illegal,
+            'final': final,
+        }
+
+    def verify_solutions(self, states, movements):
+        """ Replays the movement lists of many board states, like the
+        solutions returned by the strategies, and returns the verify dict.
+        The boards without a solution (a None movement list) are neither
+        valid nor solved.
+
+        Keyword arguments:
+        states -- list of board states
+        movements -- list of movement lists, like: [['UP', 'LEFT'], None]
+        """
+        result = self.verify(self.boards(states), self.encode(movements))
+        missing = numpy.array([x is None for x in movements], dtype=bool)
+        result['valid'] &= ~missing
+        result['solved'] &= ~missing
+        return result